@@ -4,9 +4,11 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from backend.app.db import database as db
+# backend/ is on sys.path (alembic.ini prepend_sys_path), so these are the
+# same app.* modules uvicorn loads and the models register on one Base
+from app.db import database as db
 import os
-from backend.app.models import models as model
+from app.models import models as model
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,40 @@
+"""index case foreign keys
+
+Revision ID: 4c2e9a71d5b3
+Revises: b739d8630437
+Create Date: 2026-02-14 18:42:05.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c2e9a71d5b3'
+down_revision: Union[str, None] = 'b739d8630437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs every case endpoint filters on
+_INDEXED = [
+    ("cases", "created_by_user_id"),
+    ("case_files", "case_id"),
+    ("case_documents_text", "case_id"),
+    ("case_structured", "case_id"),
+    ("case_audio_files", "case_id"),
+    ("case_audio_transcripts", "case_id"),
+    ("case_image_findings", "case_id"),
+    ("case_jobs", "case_id"),
+]
+
+
+def upgrade() -> None:
+    for table, column in _INDEXED:
+        op.create_index(op.f(f"ix_{table}_{column}"), table, [column], unique=False)
+
+
+def downgrade() -> None:
+    for table, column in reversed(_INDEXED):
+        op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
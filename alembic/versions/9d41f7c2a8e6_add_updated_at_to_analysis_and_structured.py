@@ -0,0 +1,29 @@
+"""add updated_at to case_analysis and case_structured
+
+Revision ID: 9d41f7c2a8e6
+Revises: 4c2e9a71d5b3
+Create Date: 2026-02-21 11:07:38.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41f7c2a8e6'
+down_revision: Union[str, None] = '4c2e9a71d5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Bumped by the ORM on every in-place upsert; the analysis ETag keys on it
+    op.add_column('case_analysis', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True))
+    op.add_column('case_structured', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('case_structured', 'updated_at')
+    op.drop_column('case_analysis', 'updated_at')
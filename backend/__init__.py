@@ -1,5 +0,0 @@
-from .model import CaseAnalysis
-from .model import Cases
-from .model import CaseStructured
-from .model import CaseDocumentsText
-from .db import Base
\ No newline at end of file
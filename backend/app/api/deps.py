@@ -1,11 +1,15 @@
+import threading
+import time
+from collections import OrderedDict
 from typing import Annotated, Optional
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.db.database import SessionLocal
 import app.models.models as model
 import app.core.security as security
+from app.services.runner import LLMRunner
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -18,6 +22,10 @@ def get_db():
 
 db_dependency = Annotated[Session, Depends(get_db)]
 
+def get_llm_runner(request: Request) -> LLMRunner:
+    """The app-wide LLMRunner created at startup."""
+    return request.app.state.llm_runner
+
 def get_current_user_from_token(token: str = Depends(oauth2_scheme), db: db_dependency = None) -> model.Users:
     credential_exception = HTTPException(status_code=401, detail="Invalid auth credentials")
     payload = security.verify_token(token)
@@ -30,3 +38,44 @@ def get_current_user_from_token(token: str = Depends(oauth2_scheme), db: db_depe
     if user is None:
         raise credential_exception
     return user
+
+
+# user id → monotonic expiry. The token already authenticates the user;
+# this only re-confirms the account still exists once per TTL instead of
+# on every request. Bounded LRU, guarded because handlers run on the
+# threadpool.
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_SIZE = 10000
+_known_users: "OrderedDict[int, float]" = OrderedDict()
+_known_users_lock = threading.Lock()
+
+
+def _token_user_id(token: str) -> int:
+    credential_exception = HTTPException(status_code=401, detail="Invalid auth credentials")
+    payload = security.verify_token(token)
+    if payload is None:
+        raise credential_exception
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise credential_exception
+
+
+def get_current_user_id_from_token(token: str = Depends(oauth2_scheme), db: db_dependency = None) -> int:
+    """Authenticated user id for endpoints that only need the id."""
+    user_id = _token_user_id(token)
+    now = time.monotonic()
+    with _known_users_lock:
+        if _known_users.get(user_id, 0.0) > now:
+            _known_users.move_to_end(user_id)
+            return user_id
+    exists = db.query(model.Users.id).filter(model.Users.id == user_id).first()
+    with _known_users_lock:
+        if exists is None:
+            _known_users.pop(user_id, None)
+            raise HTTPException(status_code=401, detail="Invalid auth credentials")
+        _known_users[user_id] = now + USER_CACHE_TTL_SECONDS
+        _known_users.move_to_end(user_id)
+        while len(_known_users) > USER_CACHE_SIZE:
+            _known_users.popitem(last=False)
+    return user_id
@@ -8,7 +8,7 @@ from app.api.deps import db_dependency, get_current_user_from_token
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register")
-async def register_user(user: schema.UserCreate, db: db_dependency) -> dict:
+def register_user(user: schema.UserCreate, db: db_dependency) -> dict:
     if not user.email or not user.password:
         return {"error": "Email and passwords are required"}
     elif "@" not in user.email:
@@ -24,7 +24,7 @@ async def register_user(user: schema.UserCreate, db: db_dependency) -> dict:
     return {"Message": "User Registered Successfully", "user_id": new_user.id}
 
 @router.post("/login")
-async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: db_dependency = None):
+def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: db_dependency = None):
     user = db.query(model.Users).filter(model.Users.email == form_data.username).first()
     if not user or not security.verify_password(form_data.password, user.password):
         raise HTTPException(status_code=400, detail="Invalid Credentials")
@@ -1,6 +1,6 @@
 import io
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, Header, Response
 import app.schemas.schemas as schema
 import app.models.models as model
 import app.services.pdf_extractor as pdf_extractor
@@ -17,20 +17,24 @@ from app.services.trust_report_builder import build_trust_report
 from app.services.canonical_narrative import build_canonical_narrative
 from app.services.medasr_transcriber import transcribe_audio_bytes, compute_audio_hash
 from app.services.image_captioner import caption_image_bytes, compute_image_hash
-from app.api.deps import db_dependency, get_current_user_from_token
+from app.api.deps import db_dependency, get_current_user_id_from_token, get_llm_runner
+from app.utils.job_progress import progress_store
+from app.utils.cache import stable_hash
+from app.utils.responses import OrjsonResponse
 from typing import Optional, List
+from sqlalchemy.orm import defer, joinedload, selectinload
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
 @router.post("")
-async def create_case(case: schema.CaseCreate, db: db_dependency, current_user: model.Users = Depends(get_current_user_from_token)):
+def create_case(case: schema.CaseCreate, db: db_dependency, current_user_id: int = Depends(get_current_user_id_from_token)):
     if not case.title or not case.chief_complaint:
         return {"error": "Title and chief complaint are required"}
     first_user = db.query(model.Users).first()
     if not first_user:
         return {"error": "No users found. Please register first."}
     new_case = model.Cases(
-        created_by_user_id=current_user.id,
+        created_by_user_id=current_user_id,
         title=case.title,
         chief_complaint=case.chief_complaint,
         history_present_illness=case.history_present_illness,
@@ -43,67 +47,102 @@ async def create_case(case: schema.CaseCreate, db: db_dependency, current_user:
     return {"message": "Case created successfully", "case_id": new_case.id}
 
 @router.get("")
-async def get_cases(current_user: model.Users = Depends(get_current_user_from_token), db: db_dependency = None):
-    cases = db.query(model.Cases).filter(model.Cases.created_by_user_id == current_user.id).all()
+def get_cases(current_user_id: int = Depends(get_current_user_id_from_token), db: db_dependency = None):
+    cases = db.query(model.Cases).filter(model.Cases.created_by_user_id == current_user_id).all()
     return {"cases": [{"id": c.id, "title": c.title, "chief_complaint": c.chief_complaint, "created_by_user_id": c.created_by_user_id} for c in cases]}
 
 @router.get("/{case_id}")
-async def get_case(case_id: int, db: db_dependency = None, current_user: model.Users = Depends(get_current_user_from_token)):
-    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id).first()
+def get_case(case_id: int, db: db_dependency = None, current_user_id: int = Depends(get_current_user_id_from_token)):
+    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user_id).first()
     if not case:
         return {"error": "Case not found"}
     return {"case": {"id": case.id, "title": case.title, "chief_complaint": case.chief_complaint, "created_by_user_id": case.created_by_user_id}}
 
+def _upload_size(file: UploadFile) -> int:
+    """
+    Size of an upload from its spooled temp file, without reading it into
+    memory; the file is left positioned at the start for streaming.
+    """
+    file.file.seek(0, io.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
 @router.post("/{case_id}/files")
-async def upload_case_file(case_id: int, file: UploadFile = File(...), db: db_dependency = None, current_user: model.Users = Depends(get_current_user_from_token)):
+def upload_case_file(case_id: int, file: UploadFile = File(...), db: db_dependency = None, current_user_id: int = Depends(get_current_user_id_from_token)):
     if file.content_type not in ["application/pdf", "image/png", "image/jpeg"]:
         return {"error": "Unsupported file type"}
-    data = await file.read()
-    size = len(data)
+    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user_id).first()
+    if not case:
+        return {"Error": "Case not found"}
+    size = _upload_size(file)
     if size > 5 * 1024 * 1024:
         return {"error": "File size exceeds limit"}
     key = f"case_{case_id}/{uuid.uuid4()}-{file.filename}"
-    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id).first()
-    if not case:
-        return {"Error": "Case not found"}
     new_file = model.CaseFiles(case_id=case_id, file_name=file.filename, content_type=file.content_type, object_key=key, size_bytes=size)
     db.add(new_file)
     db.commit()
     db.refresh(new_file)
-    object_store.object_store.upload_fileobj(fileobj=io.BytesIO(data), key=key, content_type=file.content_type)
+    # boto3 reads the spooled file in chunks (multipart when large)
+    object_store.object_store.upload_fileobj(fileobj=file.file, key=key, content_type=file.content_type)
     return {"File Uploaded Successfully": key, "size": size}
 
+def _load_case_for_normalize(db, case_id: int, user_id: int):
+    """
+    The case, its CaseStructured row and every modality in one joined
+    query plus two IN-loads, instead of one query per table.
+    """
+    return db.query(model.Cases, model.CaseStructured).outerjoin(
+        model.CaseStructured, model.CaseStructured.case_id == model.Cases.id
+    ).options(
+        joinedload(model.Cases.documents),
+        selectinload(model.Cases.audio_transcripts),
+        selectinload(model.Cases.image_findings),
+    ).filter(
+        model.Cases.id == case_id,
+        model.Cases.created_by_user_id == user_id,
+    ).populate_existing().first()
+
+
 @router.post("/{case_id}/normalize")
-async def normalize_case_data(case_id: int, db: db_dependency = None, current_user: model.Users = Depends(get_current_user_from_token)):
-    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id).first()
-    if not case:
+def normalize_case_data(case_id: int, db: db_dependency = None, current_user_id: int = Depends(get_current_user_id_from_token)):
+    row = _load_case_for_normalize(db, case_id, current_user_id)
+    if not row:
         return {"error": "Case not found"}
-    pdf_extractor.process_pdf_extraction(db, case_id)
+    pdf_result = pdf_extractor.process_pdf_extraction(db, case_id)
+    # PDFs that failed to fetch/parse are left out of the narrative and
+    # source_hash; report them so the client knows the result is partial
+    extraction_failures = pdf_result["failed"]
+    if pdf_result["extracted"]:
+        # New document rows were committed; reload to pick them up
+        row = _load_case_for_normalize(db, case_id, current_user_id)
+    case, existing = row
     case_fields = {
         "age": case.age,
         "sex": case.sex,
         "chief_complaint": case.chief_complaint,
         "history_present_illness": case.history_present_illness
     }
-    docs = db.query(model.CaseDocumentsText).filter(model.CaseDocumentsText.case_id == case.id).all()
+    docs = case.documents
     extracted_docs = [{
         "file_id": d.file_id,
         "extracted_text": d.extracted_text,
     } for d in docs]
 
     # Phase 7: include transcripts + image captions in source hash
-    transcripts = db.query(model.CaseAudioTranscript).filter(model.CaseAudioTranscript.case_id == case_id).all()
-    image_findings = db.query(model.CaseImageFinding).filter(model.CaseImageFinding.case_id == case_id).all()
+    transcripts = case.audio_transcripts
+    image_findings = case.image_findings
     transcript_texts = [t.transcript_text for t in transcripts if t.transcript_text]
     caption_texts = [f.caption_text for f in image_findings if f.caption_text]
 
     source_hash = compute_source_hash(case_fields, extracted_docs, transcripts=transcript_texts, image_captions=caption_texts)
-    existing = db.query(model.CaseStructured).filter(model.CaseStructured.case_id == case_id).first()
     if existing and existing.source_hash == source_hash:
         return {
             "case_id": case_id,
             "status": "already_normalized",
-            "source_hash": source_hash
+            "source_hash": source_hash,
+            "extraction_failures": extraction_failures,
         }
 
     # Phase 7: canonical narrative merges all modalities
@@ -121,17 +160,18 @@ async def normalize_case_data(case_id: int, db: db_dependency = None, current_us
         db.add(new_case)
         db.commit()
         db.refresh(new_case)
-    return {
+    return OrjsonResponse({
         "message": "Case Normalized",
         "case_id": case_id,
         "status": "Normalized",
         "structured_case": structured_json,
         "source_hash": source_hash,
         "documents_extracted": len(docs),
+        "extraction_failures": extraction_failures,
         "transcripts_included": len(transcript_texts),
         "image_captions_included": len(caption_texts),
         "narrative": narrative[:1500]
-    }
+    })
 
 @router.post("/{case_id}/analyze")
 def analyze_case(
@@ -139,9 +179,10 @@ def analyze_case(
     body: schema.AnalyzeRequest,
     include: Optional[str] = Query(None, description="Comma-separated: spotlight,estimate"),
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
+    runner: LLMRunner = Depends(get_llm_runner),
 ):
-    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id).first()
+    case = db.query(model.Cases).filter(model.Cases.id == case_id, model.Cases.created_by_user_id == current_user_id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -151,7 +192,6 @@ def analyze_case(
     narrative_text = case.narrative_text if hasattr(case, "narrative_text") else ""
     if not narrative_text:
         narrative_text = ""
-    runner = LLMRunner(base_url="http://localhost:8080/", model="mlx-community/medgemma-4b-it-4bit")
     analysis_row, cache_hit = generate_case_analysis(db, case_id=case_id, structured_source_hash=structured.source_hash, structured_case=structured.normalized_data, narrative=narrative_text, analysis_version=body.analysis_version, force=body.force, runner=runner)
 
     result = {
@@ -175,31 +215,50 @@ def analyze_case(
     if "trust" in includes:
         result["trust_report"] = _run_trust(db, case_id, structured, analysis_row, narrative_text)
 
-    return result
+    return OrjsonResponse(result)
 
 @router.get("/{case_id}/analysis")
 def get_analysis(
     case_id: int,
     analysis_version: str = "v1",
     source_hash: str = None,
+    if_none_match: Optional[str] = Header(default=None),
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
-    case = db.query(model.Cases).filter(
+    # Large columns are deferred: a revalidating poll is answered from ids
+    # and updated_at stamps alone, and the payload loads only for a 200.
+    case = db.query(model.Cases).options(defer(model.Cases.narrative_text)).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     row = case_analysis.get_latest_case_analysis(
-        db, case_id=case_id, analysis_version=analysis_version, source_hash=source_hash
+        db, case_id=case_id, analysis_version=analysis_version, source_hash=source_hash,
+        defer_data=True,
     )
     if not row:
         raise HTTPException(status_code=404, detail="No analysis found for this case")
 
-    struct = db.query(model.CaseStructured).filter(model.CaseStructured.case_id == case_id).first()
-
-    return {
+    struct = db.query(model.CaseStructured).options(
+        defer(model.CaseStructured.normalized_data)
+    ).filter(model.CaseStructured.case_id == case_id).first()
+
+    # Forced re-analysis and re-normalization rewrite rows in place under
+    # the same id and source_hash; updated_at is bumped on every such
+    # upsert (and on the case when its narrative changes), so it versions
+    # the body without hashing it.
+    etag = '"' + stable_hash({
+        "analysis": [row.id, row.updated_at],
+        "structured": [struct.id, struct.updated_at] if struct else None,
+        "case_updated_at": case.updated_at,
+    }) + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    return OrjsonResponse({
         "case_id": row.case_id,
         "source_hash": row.source_hash,
         "analysis_version": row.analysis_version,
@@ -208,7 +267,7 @@ def get_analysis(
         "narrative": case.narrative_text if hasattr(case, "narrative_text") else "",
         "cache_hit": True,
         "created_at": row.created_at,
-    }
+    }, headers=headers)
 
 
 # ── Phase 5: UI endpoints ──────────────────────────────────────────
@@ -218,12 +277,12 @@ def get_case_summary(
     case_id: int,
     analysis_version: str = "v1",
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     """UI-optimized clinical summary card."""
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -275,12 +334,12 @@ def compare_analyses(
     hash2: str,
     analysis_version: str = "v1",
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     """Compare two analysis versions for the same case."""
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -407,11 +466,11 @@ def _run_spotlight(db, case_id, structured, analysis_row, narrative) -> dict:
 def compute_estimate(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -427,18 +486,18 @@ def compute_estimate(
         raise HTTPException(status_code=400, detail="Analyze case first")
 
     data = _run_estimate(db, case_id, structured, analysis)
-    return {"case_id": case_id, "estimate": data, "source_hash": structured.source_hash}
+    return OrjsonResponse({"case_id": case_id, "estimate": data, "source_hash": structured.source_hash})
 
 
 @router.get("/{case_id}/estimate")
 def get_estimate(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -449,18 +508,18 @@ def get_estimate(
     if not row:
         raise HTTPException(status_code=404, detail="No cost estimate found — run POST /estimate first")
 
-    return {"case_id": case_id, "estimate": row.estimate_data, "source_hash": row.source_hash}
+    return OrjsonResponse({"case_id": case_id, "estimate": row.estimate_data, "source_hash": row.source_hash})
 
 
 @router.post("/{case_id}/spotlight")
 def compute_spotlight(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -477,18 +536,18 @@ def compute_spotlight(
 
     narrative_text = ""
     data = _run_spotlight(db, case_id, structured, analysis, narrative_text)
-    return {"case_id": case_id, "spotlight": data, "source_hash": structured.source_hash}
+    return OrjsonResponse({"case_id": case_id, "spotlight": data, "source_hash": structured.source_hash})
 
 
 @router.get("/{case_id}/spotlight")
 def get_spotlight(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -499,7 +558,7 @@ def get_spotlight(
     if not row:
         raise HTTPException(status_code=404, detail="No spotlight found — run POST /spotlight first")
 
-    return {"case_id": case_id, "spotlight": row.spotlight_data, "source_hash": row.source_hash}
+    return OrjsonResponse({"case_id": case_id, "spotlight": row.spotlight_data, "source_hash": row.source_hash})
 
 
 # ── Phase 6: Trust Report helpers + endpoints ─────────────────
@@ -538,11 +597,11 @@ def _run_trust(db, case_id, structured, analysis_row, narrative) -> dict:
 def compute_trust_report(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -559,18 +618,18 @@ def compute_trust_report(
 
     narrative_text = ""
     data = _run_trust(db, case_id, structured, analysis, narrative_text)
-    return {"case_id": case_id, "trust_report": data, "source_hash": structured.source_hash}
+    return OrjsonResponse({"case_id": case_id, "trust_report": data, "source_hash": structured.source_hash})
 
 
 @router.get("/{case_id}/trust_report")
 def get_trust_report(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
         model.Cases.id == case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -581,7 +640,7 @@ def get_trust_report(
     if not row:
         raise HTTPException(status_code=404, detail="No trust report found — run POST /trust_report first")
 
-    return {"case_id": case_id, "trust_report": row.trust_data, "source_hash": row.source_hash}
+    return OrjsonResponse({"case_id": case_id, "trust_report": row.trust_data, "source_hash": row.source_hash})
 
 
 # ── Phase 7: Multimodal Ingestion endpoints ─────────────────────
@@ -590,27 +649,26 @@ AUDIO_TYPES = {"audio/mpeg", "audio/wav", "audio/x-m4a", "audio/mp4", "audio/x-w
 
 
 @router.post("/{case_id}/audio")
-async def upload_audio(
+def upload_audio(
     case_id: int,
     file: UploadFile = File(...),
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
-        model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id
+        model.Cases.id == case_id, model.Cases.created_by_user_id == current_user_id
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     if file.content_type not in AUDIO_TYPES:
         raise HTTPException(status_code=400, detail=f"Unsupported audio type: {file.content_type}. Accepted: {AUDIO_TYPES}")
 
-    data = await file.read()
-    size = len(data)
+    size = _upload_size(file)
     if size > 50 * 1024 * 1024:  # 50MB limit
         raise HTTPException(status_code=400, detail="Audio file too large (max 50MB)")
 
     key = f"case_{case_id}/audio/{uuid.uuid4()}-{file.filename}"
-    object_store.object_store.upload_fileobj(fileobj=io.BytesIO(data), key=key, content_type=file.content_type)
+    object_store.object_store.upload_fileobj(fileobj=file.file, key=key, content_type=file.content_type)
 
     audio_file = model.CaseAudioFile(
         case_id=case_id,
@@ -630,10 +688,10 @@ async def upload_audio(
 def transcribe_case_audio(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
-        model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id
+        model.Cases.id == case_id, model.Cases.created_by_user_id == current_user_id
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -706,10 +764,10 @@ def transcribe_case_audio(
 def caption_case_images(
     case_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     case = db.query(model.Cases).filter(
-        model.Cases.id == case_id, model.Cases.created_by_user_id == current_user.id
+        model.Cases.id == case_id, model.Cases.created_by_user_id == current_user_id
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -785,7 +843,7 @@ def ingest_all(
     case_id: int,
     background_tasks: BackgroundTasks,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     """
     One-click pipeline: PDF → transcribe → caption → normalize →
@@ -794,7 +852,7 @@ def ingest_all(
     """
     from app.services.pipeline_runner import create_ingest_job, run_full_ingest_background
     job_id = create_ingest_job(db, case_id)
-    background_tasks.add_task(run_full_ingest_background, job_id, case_id, current_user.id)
+    background_tasks.add_task(run_full_ingest_background, job_id, case_id, current_user_id)
     return {"message": "Pipeline started in background", "job_id": job_id}
 
 
@@ -802,7 +860,7 @@ def ingest_all(
 def get_job_status(
     job_id: int,
     db: db_dependency = None,
-    current_user=Depends(get_current_user_from_token),
+    current_user_id: int = Depends(get_current_user_id_from_token),
 ):
     """Get status of a pipeline job."""
     job = db.query(model.CaseJob).filter(model.CaseJob.id == job_id).first()
@@ -811,10 +869,13 @@ def get_job_status(
     # Verify ownership
     case = db.query(model.Cases).filter(
         model.Cases.id == job.case_id,
-        model.Cases.created_by_user_id == current_user.id,
+        model.Cases.created_by_user_id == current_user_id,
     ).first()
     if not case:
         raise HTTPException(status_code=404, detail="Job not found")
+    meta_data = job.meta_data
+    if job.status == "running":
+        meta_data = progress_store.get(job.id) or meta_data
     return {
         "job_id": job.id,
         "case_id": job.case_id,
@@ -823,5 +884,5 @@ def get_job_status(
         "started_at": job.started_at,
         "finished_at": job.finished_at,
         "error_message": job.error_message,
-        "meta_data": job.meta_data,
+        "meta_data": meta_data,
     }
@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
+import orjson
 import os
 
 load_dotenv()
@@ -10,7 +11,28 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set. Please check your .env file or config.ini")
 
-engine = create_engine(DATABASE_URL)
+
+def _json_serializer(obj) -> str:
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Sized for the threadpool handlers + pipeline threads; pre_ping drops
+# connections the server closed, recycle stays under idle timeouts.
+_pool_options = {} if DATABASE_URL.startswith("sqlite") else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,
+}
+
+# JSON/JSONB columns (structured cases, analyses, reports) go through orjson
+engine = create_engine(
+    DATABASE_URL,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    **_pool_options,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
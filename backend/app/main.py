@@ -3,10 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.db.database import engine
 import app.models.models as model
 import app.utils.object_store as object_store
+from app.services.runner import LLMRunner
+from app.utils.responses import OrjsonResponse
 
 from app.api.routers import auth, cases, health
 
-app = FastAPI(title="ProjectOdyssey")
+
+
+app = FastAPI(title="ProjectOdyssey", default_response_class=OrjsonResponse)
 
 origins = [
     "http://localhost:5173",
@@ -25,6 +29,8 @@ model.Base.metadata.create_all(bind=engine)
 
 @app.on_event("startup")
 async def startup_event():
+    # One runner for the app's lifetime, handed to routes via deps.get_llm_runner
+    app.state.llm_runner = LLMRunner(base_url="http://localhost:8080/", model="mlx-community/medgemma-4b-it-4bit")
     object_store.object_store.ensure_bucket_exists()
 
 app.include_router(health.router)
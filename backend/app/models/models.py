@@ -1,6 +1,7 @@
 from sqlalchemy import ForeignKey, Column, Integer, String, DateTime,Text
 from sqlalchemy.sql import func
 from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import relationship
 from app.db.database import Base
 import datetime
 from sqlalchemy.dialects.postgresql import JSONB
@@ -16,7 +17,7 @@ class Users(Base):
 class Cases(Base):
     __tablename__ = 'cases'
     id = Column(Integer, primary_key=True, index=True)
-    created_by_user_id = Column(Integer, ForeignKey('users.id'))
+    created_by_user_id = Column(Integer, ForeignKey('users.id'), index=True)
     title = Column(String)
     chief_complaint = Column(String)
     history_present_illness = Column(String, nullable=True)
@@ -26,11 +27,16 @@ class Cases(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
+    # Read-only collections used to load a case's sources in one go
+    documents = relationship("CaseDocumentsText", viewonly=True)
+    audio_transcripts = relationship("CaseAudioTranscript", viewonly=True)
+    image_findings = relationship("CaseImageFinding", viewonly=True)
+
 
 class CaseFiles(Base):
     __tablename__ = 'case_files'
     id = Column(Integer, primary_key=True, index=True)
-    case_id = Column(Integer, ForeignKey('cases.id'))
+    case_id = Column(Integer, ForeignKey('cases.id'), index=True)
     file_name = Column(String)
     content_type = Column(String)
     object_key = Column(String)
@@ -48,7 +54,7 @@ class AuditLogs(Base):
 class CaseDocumentsText(Base):
     __tablename__ = "case_documents_text"
     id = Column(Integer,primary_key=True,index = True)
-    case_id = Column(Integer,ForeignKey("cases.id"))
+    case_id = Column(Integer,ForeignKey("cases.id"),index=True)
     file_id = Column(Integer,ForeignKey("case_files.id"))
     extracted_text = Column(Text,nullable=False)
     extraction_method = Column(String)
@@ -57,11 +63,11 @@ class CaseDocumentsText(Base):
 class CaseStructured(Base):
     __tablename__ = "case_structured"
     id = Column(Integer,primary_key = True,index = True)
-    case_id = Column(Integer,ForeignKey("cases.id"))
+    case_id = Column(Integer,ForeignKey("cases.id"),index=True)
     normalized_data = Column(JSONB,nullable=False)
     source_hash = Column(String)
     created_at = Column(DateTime,default = datetime.datetime.utcnow)
-    #updated_at = Column(DateTime,default = datetime.datetime.utcnow,onupdate=datetime.datetime.utcnow)
+    updated_at = Column(DateTime,default = datetime.datetime.utcnow,onupdate=datetime.datetime.utcnow)
 
 class CaseAnalysis(Base):
     __tablename__ = "case_analysis"
@@ -71,6 +77,7 @@ class CaseAnalysis(Base):
     analysis_version = Column(Text,nullable=False,default="v1")
     analysis_data = Column(JSONB,nullable=False)
     created_at = Column(DateTime,default=datetime.datetime.utcnow,nullable=False)
+    updated_at = Column(DateTime,default=datetime.datetime.utcnow,onupdate=datetime.datetime.utcnow)
     __table_args__ = (
         UniqueConstraint("case_id","source_hash","analysis_version",name="uq_case_analysis_case_hash_version"),
     )
@@ -127,7 +134,7 @@ class CaseTrustReport(Base):
 class CaseAudioFile(Base):
     __tablename__ = "case_audio_files"
     id = Column(Integer, primary_key=True)
-    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), nullable=False)
+    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), index=True, nullable=False)
     file_name = Column(String, nullable=True)
     object_key = Column(String, nullable=False)
     content_type = Column(String, nullable=True)
@@ -138,7 +145,7 @@ class CaseAudioFile(Base):
 class CaseAudioTranscript(Base):
     __tablename__ = "case_audio_transcripts"
     id = Column(Integer, primary_key=True)
-    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), nullable=False)
+    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), index=True, nullable=False)
     audio_file_id = Column(Integer, ForeignKey("case_audio_files.id", ondelete="CASCADE"), nullable=True)
     transcript_text = Column(String, nullable=False)
     extraction_method = Column(String, default="whisper")
@@ -150,7 +157,7 @@ class CaseAudioTranscript(Base):
 class CaseImageFinding(Base):
     __tablename__ = "case_image_findings"
     id = Column(Integer, primary_key=True)
-    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), nullable=False)
+    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), index=True, nullable=False)
     file_id = Column(Integer, ForeignKey("case_files.id", ondelete="CASCADE"), nullable=True)
     caption_text = Column(String, nullable=False)
     extraction_method = Column(String, default="medgemma_vision")
@@ -162,7 +169,7 @@ class CaseImageFinding(Base):
 class CaseJob(Base):
     __tablename__ = "case_jobs"
     id = Column(Integer, primary_key=True)
-    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), nullable=False)
+    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), index=True, nullable=False)
     job_type = Column(String, nullable=False)  # extract, transcribe, caption, normalize, analyze, ingest_all
     status = Column(String, default="pending")  # pending, running, complete, failed
     started_at = Column(DateTime, nullable=True)
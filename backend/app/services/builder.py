@@ -16,7 +16,7 @@ import logging
 from sqlalchemy.orm import Session
 
 from app.services.case_analysis import get_case_analysis, create_case_analysis
-from app.utils.cache import compute_analysis_source_hash, compute_narrative_hash
+from app.utils.cache import compute_analysis_source_hash, compute_narrative_hash, stable_hash
 from app.services.runner import LLMRunner
 from app.utils.prompts import PROMPT_VERSION
 from app.services.validator import enforce_analysis_rules
@@ -60,6 +60,10 @@ def generate_case_analysis(
             return existing, True
 
     # ── 2. run LLM ──
+    # End the open transaction first so the pooled connection isn't held
+    # idle-in-transaction for the whole generation; the session picks up
+    # a fresh one when it persists below.
+    db.commit()
     analysis_data, latency_ms = runner.analyze(
         structured_case=structured_case,
         narrative=narrative,
@@ -83,14 +87,22 @@ def generate_case_analysis(
         analysis_data=analysis_data.model_dump(),
         documents=None,
         cfg=HallucinationConfig(mode="warn"),
+        # Keyed on content, not structured_source_hash: a forced
+        # re-normalization can change structured_case under the same hash.
+        source_hash=stable_hash({"structured_case": structured_case, "narrative": narrative}),
     )
 
     # Promote findings into quality issues for UI
+    issues = analysis_data.contradiction_or_quality_issues
+    seen = set(issues)
+    new_issues: list[str] = []
     for f in hallucination_report.findings:
         if f.severity in ("warning", "error"):
             msg = f"[hallucination:{f.severity}] {f.category}: {f.claim[:120]}"
-            if msg not in analysis_data.contradiction_or_quality_issues:
-                analysis_data.contradiction_or_quality_issues.append(msg)
+            if msg not in seen:
+                seen.add(msg)
+                new_issues.append(msg)
+    issues.extend(new_issues)
 
     # ── 7. validate quality ──
     warnings = enforce_analysis_rules(analysis_data)
@@ -1,7 +1,7 @@
 """
 Case analysis data access layer.
 """
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from app.models.models import CaseAnalysis
 from typing import Optional
 
@@ -26,9 +26,16 @@ def get_latest_case_analysis(
     case_id: int,
     analysis_version: str,
     source_hash: Optional[str] = None,
+    defer_data: bool = False,
 ) -> Optional[CaseAnalysis]:
-    """Latest analysis for a case, optionally filtered by source_hash."""
-    q = db.query(CaseAnalysis).filter(
+    """
+    Latest analysis for a case, optionally filtered by source_hash.
+    defer_data leaves analysis_data unloaded until it is first accessed.
+    """
+    q = db.query(CaseAnalysis)
+    if defer_data:
+        q = q.options(defer(CaseAnalysis.analysis_data))
+    q = q.filter(
         CaseAnalysis.case_id == case_id,
         CaseAnalysis.analysis_version == analysis_version,
     )
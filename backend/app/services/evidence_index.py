@@ -9,6 +9,8 @@ This is the foundation of the anti-hallucination firewall.
 import re
 from typing import Any
 
+import ahocorasick
+
 _WS = re.compile(r"\s+")
 _PUNCT = re.compile(r"[^\w\s\.\+\-/%]")
 
@@ -112,27 +114,11 @@ def build_evidence_index(
     return evidence_map
 
 
-def check_claim(claim: str, evidence_map: dict[str, list[str]]) -> tuple[bool, str | None, str | None]:
-    """
-    Check if a claim is supported by the evidence index.
-
-    Returns (supported, source_path, source_excerpt).
-    Uses: exact substring → token overlap → alias expansion
-    """
-    claim_norm = _normalize(claim)
-    if not claim_norm:
-        return True, None, None
-
-    # 1. Exact match in evidence map
-    if claim_norm in evidence_map:
-        paths = evidence_map[claim_norm]
-        return True, paths[0], claim_norm
-
-    # 2. Check if claim is substring of any evidence key
-    for key, paths in evidence_map.items():
-        if claim_norm in key or key in claim_norm:
-            return True, paths[0], key
-
+def _check_overlap_or_alias(
+    claim_norm: str,
+    evidence_map: dict[str, list[str]],
+) -> tuple[bool, str | None, str | None]:
+    """Steps 3–4 of check_claim: token overlap, then alias expansion."""
     # 3. Token overlap: if ≥70% of claim tokens appear in evidence
     claim_tokens = set(claim_norm.split())
     if not claim_tokens:
@@ -159,3 +145,94 @@ def check_claim(claim: str, evidence_map: dict[str, list[str]]) -> tuple[bool, s
         return True, evidence_map[canonical][0], canonical
 
     return False, None, None
+
+
+def check_claim(claim: str, evidence_map: dict[str, list[str]]) -> tuple[bool, str | None, str | None]:
+    """
+    Check if a claim is supported by the evidence index.
+
+    Returns (supported, source_path, source_excerpt).
+    Uses: exact substring → token overlap → alias expansion
+    """
+    claim_norm = _normalize(claim)
+    if not claim_norm:
+        return True, None, None
+
+    # 1. Exact match in evidence map
+    if claim_norm in evidence_map:
+        paths = evidence_map[claim_norm]
+        return True, paths[0], claim_norm
+
+    # 2. Check if claim is substring of any evidence key
+    for key, paths in evidence_map.items():
+        if claim_norm in key or key in claim_norm:
+            return True, paths[0], key
+
+    return _check_overlap_or_alias(claim_norm, evidence_map)
+
+
+def check_claims(
+    claims: list[str],
+    evidence_map: dict[str, list[str]],
+) -> list[tuple[bool, str | None, str | None]]:
+    """
+    Batch version of check_claim for every claim in a case.
+
+    The substring step runs through two Aho-Corasick automata — one over
+    the claims (scanned with each evidence key) and one over the evidence
+    keys (scanned with each claim) — instead of a Python loop over the
+    whole map per claim. Results match check_claim: the first key in map
+    order wins. Claims with no substring hit fall through to token
+    overlap / aliases.
+    """
+    results: list[tuple[bool, str | None, str | None] | None] = [None] * len(claims)
+    pending: dict[str, list[int]] = {}
+
+    for i, claim in enumerate(claims):
+        claim_norm = _normalize(claim)
+        if not claim_norm:
+            results[i] = (True, None, None)
+        elif claim_norm in evidence_map:
+            results[i] = (True, evidence_map[claim_norm][0], claim_norm)
+        else:
+            pending.setdefault(claim_norm, []).append(i)
+
+    if pending:
+        keys = list(evidence_map)
+        # claim_norm → index of the first key it matched, in either direction
+        first_key: dict[str, int] = {}
+
+        # An automaton with no words is never built and can't be iterated
+        if keys:
+            claim_automaton = ahocorasick.Automaton()
+            for claim_norm in pending:
+                claim_automaton.add_word(claim_norm, claim_norm)
+            claim_automaton.make_automaton()
+
+            key_automaton = ahocorasick.Automaton()
+            for idx, key in enumerate(keys):
+                key_automaton.add_word(key, idx)
+            key_automaton.make_automaton()
+
+            # claim in key — keys are visited in map order, so keep the first
+            for idx, key in enumerate(keys):
+                for _, claim_norm in claim_automaton.iter(key):
+                    first_key.setdefault(claim_norm, idx)
+
+            # key in claim
+            for claim_norm in pending:
+                for _, idx in key_automaton.iter(claim_norm):
+                    if idx < first_key.get(claim_norm, len(keys)):
+                        first_key[claim_norm] = idx
+
+        for claim_norm, indices in pending.items():
+            idx = first_key.get(claim_norm)
+            if idx is not None:
+                key = keys[idx]
+                result = (True, evidence_map[key][0], key)
+            else:
+                result = _check_overlap_or_alias(claim_norm, evidence_map)
+            for i in indices:
+                results[i] = result
+
+    return results
@@ -9,6 +9,9 @@ from app.schemas.schemas import CaseAnalysisData
 
 log = logging.getLogger(__name__)
 
+MIN_EVIDENCE_LEN = 3        # skip strings like "No" or "N/A"
+MIN_REVERSE_MATCH_LEN = 4   # min evidence length for "field in evidence" matches
+
 
 def _find_source(text: str, structured_case: dict) -> str | None:
     """
@@ -17,40 +20,47 @@ def _find_source(text: str, structured_case: dict) -> str | None:
     """
     text_lower = text.lower().strip()
 
+    # Very short strings ("No", "N/A") would match almost any field
+    if len(text_lower) < MIN_EVIDENCE_LEN:
+        return None
+    # Only let a field match inside the evidence text when the evidence
+    # is long enough to plausibly contain it
+    allow_reverse = len(text_lower) >= MIN_REVERSE_MATCH_LEN
+
     # Check symptom lists
     for i, sym in enumerate(structured_case.get("symptoms", [])):
-        if text_lower in sym.lower() or sym.lower() in text_lower:
+        if text_lower in sym.lower() or (allow_reverse and sym.lower() in text_lower):
             return f"structured.symptoms[{i}]"
 
     # Check exam findings
     for i, ef in enumerate(structured_case.get("exam_findings", [])):
-        if text_lower in ef.lower() or ef.lower() in text_lower:
+        if text_lower in ef.lower() or (allow_reverse and ef.lower() in text_lower):
             return f"structured.exam_findings[{i}]"
 
     # Check abnormal labs
     for i, lab in enumerate(structured_case.get("abnormal_labs", [])):
         lab_str = str(lab).lower()
-        if text_lower in lab_str or (lab.get("name", "").lower() in text_lower and lab.get("name")):
+        if text_lower in lab_str or (allow_reverse and lab.get("name") and lab["name"].lower() in text_lower):
             return f"structured.abnormal_labs[{i}]"
 
     # Check medications
     for i, med in enumerate(structured_case.get("medications", [])):
-        if text_lower in med.lower() or med.lower() in text_lower:
+        if text_lower in med.lower() or (allow_reverse and med.lower() in text_lower):
             return f"structured.medications[{i}]"
 
     # Check comorbidities
     for i, cm in enumerate(structured_case.get("comorbidities", [])):
-        if text_lower in cm.lower() or cm.lower() in text_lower:
+        if text_lower in cm.lower() or (allow_reverse and cm.lower() in text_lower):
             return f"structured.comorbidities[{i}]"
 
     # Check red flags
     for i, rf in enumerate(structured_case.get("red_flags", [])):
-        if text_lower in rf.lower() or rf.lower() in text_lower:
+        if text_lower in rf.lower() or (allow_reverse and rf.lower() in text_lower):
             return f"structured.red_flags[{i}]"
 
     # Check family history
     for i, fh in enumerate(structured_case.get("family_history", [])):
-        if text_lower in fh.lower() or fh.lower() in text_lower:
+        if text_lower in fh.lower() or (allow_reverse and fh.lower() in text_lower):
             return f"structured.family_history[{i}]"
 
     # Check top-level fields
@@ -10,7 +10,7 @@ import logging
 from typing import Any
 
 from app.schemas.schema_trust import EvidenceLink, DiagnosisTrust
-from app.services.evidence_index import build_evidence_index, check_claim
+from app.services.evidence_index import build_evidence_index, check_claims
 
 log = logging.getLogger(__name__)
 
@@ -55,27 +55,34 @@ def verify_analysis(
     evidence_map = build_evidence_index(structured_case, narrative)
     results: list[DiagnosisTrust] = []
 
+    # Gather every claim up front so they can be checked in one batch
+    per_dx: list[tuple[str, list[str]]] = []
+    to_check: list[str] = []
     for dx in analysis_data.get("top_differentials", []):
-        dx_name = dx.get("name", "Unknown")
-        key_ev = dx.get("key_evidence")
-        claims = _extract_claims(key_ev)
+        claims = _extract_claims(dx.get("key_evidence"))
+        per_dx.append((dx.get("name", "Unknown"), claims))
+        # Skip "Unknown: ..." markers
+        to_check.extend(c for c in claims if not c.lower().startswith("unknown"))
 
+    checked = iter(check_claims(to_check, evidence_map))
+
+    for dx_name, claims in per_dx:
         links: list[EvidenceLink] = []
+        add_link = links.append
         supported_count = 0
 
         for claim in claims:
-            # Skip "Unknown: ..." markers
             if claim.lower().startswith("unknown"):
-                links.append(EvidenceLink(
+                add_link(EvidenceLink(
                     claim=claim, supported=True,
                     reason="Acknowledged uncertainty marker",
                 ))
                 supported_count += 1
                 continue
 
-            is_supported, source_path, excerpt = check_claim(claim, evidence_map)
+            is_supported, source_path, excerpt = next(checked)
 
-            links.append(EvidenceLink(
+            add_link(EvidenceLink(
                 claim=claim,
                 supported=is_supported,
                 source_path=source_path,
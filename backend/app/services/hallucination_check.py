@@ -11,8 +11,10 @@ Strategy:
   3. Flag ungrounded claims in contradiction_or_quality_issues
   4. If hallucinations exceed threshold → inject a strong warning
 """
-import json
 import logging
+
+import orjson
+
 from app.schemas.schemas import CaseAnalysisData
 
 log = logging.getLogger(__name__)
@@ -23,7 +25,8 @@ MIN_EVIDENCE_LEN = 4         # ignore very short strings like "No" or "Yes"
 
 def _flatten_input(structured_case: dict, narrative: str) -> str:
     """Build a single lowercase string of ALL input data."""
-    return (json.dumps(structured_case, default=str) + " " + narrative).lower()
+    case_json = orjson.dumps(structured_case, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return (case_json + " " + narrative).lower()
 
 
 def _extract_evidence_strings(dx) -> list[tuple[str, str]]:
@@ -32,6 +35,7 @@ def _extract_evidence_strings(dx) -> list[tuple[str, str]]:
     Returns list of (text, category) tuples.
     """
     results = []
+    append = results.append
     ev = dx.key_evidence
     if ev is None:
         return results
@@ -40,9 +44,9 @@ def _extract_evidence_strings(dx) -> list[tuple[str, str]]:
         # Flat list: ["Positive ANA", "Low C3", ...]
         for item in ev:
             if isinstance(item, str):
-                results.append((item, "support"))
+                append((item, "support"))
             elif isinstance(item, dict):
-                results.append((item.get("text", str(item)), "support"))
+                append((item.get("text", str(item)), "support"))
 
     elif isinstance(ev, dict):
         # {"support": [...], "against": [...]} or {"attributed_evidence": [...]}
@@ -51,18 +55,18 @@ def _extract_evidence_strings(dx) -> list[tuple[str, str]]:
             if isinstance(val, list):
                 for item in val:
                     if isinstance(item, str):
-                        results.append((item, category))
+                        append((item, category))
                     elif isinstance(item, dict):
-                        results.append((item.get("text", str(item)), category))
+                        append((item.get("text", str(item)), category))
             elif isinstance(val, str):
-                results.append((val, category))
+                append((val, category))
 
     elif hasattr(ev, "support"):
         # EvidenceItem Pydantic model
         for s in ev.support:
-            results.append((s, "support"))
+            append((s, "support"))
         for s in ev.against:
-            results.append((s, "against"))
+            append((s, "against"))
 
     return results
 
@@ -85,9 +89,12 @@ def validate_grounding(
     """
     input_blob = _flatten_input(structured_case, narrative)
     hallucinations: list[str] = []
+    total_checked = 0
 
     for dx in analysis_data.top_differentials:
+        dx_name = dx.name
         evidence_pairs = _extract_evidence_strings(dx)
+        total_checked += len(evidence_pairs)
 
         for text, category in evidence_pairs:
             clean = text.strip()
@@ -106,13 +113,18 @@ def validate_grounding(
                 continue
 
             # Not found — this is an ungrounded claim
-            label = f"{category.capitalize()} not grounded: \"{clean[:80]}\" (DX: {dx.name})"
+            label = f"{category.capitalize()} not grounded: \"{clean[:80]}\" (DX: {dx_name})"
             hallucinations.append(label)
 
-    # Inject into quality issues
+    # Inject into quality issues (set lookup, one extend)
+    issues = analysis_data.contradiction_or_quality_issues
+    seen = set(issues)
+    new_issues: list[str] = []
     for h in hallucinations:
-        if h not in analysis_data.contradiction_or_quality_issues:
-            analysis_data.contradiction_or_quality_issues.append(h)
+        if h not in seen:
+            seen.add(h)
+            new_issues.append(h)
+    issues.extend(new_issues)
 
     # Threshold warning
     if len(hallucinations) > HALLUCINATION_THRESHOLD:
@@ -120,15 +132,15 @@ def validate_grounding(
             f"⚠ GROUNDING ALERT: {len(hallucinations)} evidence claims could not be "
             f"traced to input data. Analysis reliability is degraded."
         )
-        if critical_msg not in analysis_data.contradiction_or_quality_issues:
-            analysis_data.contradiction_or_quality_issues.insert(0, critical_msg)
+        if critical_msg not in seen:
+            issues.insert(0, critical_msg)
         log.warning(critical_msg)
 
     if hallucinations:
         log.info(
             "Grounding: %d/%d evidence items ungrounded for case",
             len(hallucinations),
-            sum(len(_extract_evidence_strings(dx)) for dx in analysis_data.top_differentials),
+            total_checked,
         )
     else:
         log.info("Grounding: all evidence items verified ✅")
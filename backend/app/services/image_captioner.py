@@ -5,18 +5,22 @@ Uses the local MedGemma vision model (via MLX-VLM server) to generate
 structured clinical captions/findings from uploaded images.
 """
 import base64
-import hashlib
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
+import orjson
+from blake3 import blake3
+
+from app.utils.cache import format_digest
+from app.utils.http import llm_session
 
 log = logging.getLogger(__name__)
 
 
 def compute_image_hash(image_bytes: bytes) -> str:
-    """SHA-256 hash of image file bytes."""
-    return hashlib.sha256(image_bytes).hexdigest()
+    """BLAKE3 hash of image file bytes."""
+    return format_digest(blake3(image_bytes))
 
 
 CAPTION_PROMPT = """You are a clinical imaging assistant.
@@ -62,13 +66,13 @@ def caption_image_bytes(
     }
 
     try:
-        r = requests.post(
+        r = llm_session.post(
             f"{base_url.rstrip('/')}/chat/completions",
             json=payload,
             timeout=120,
         )
         r.raise_for_status()
-        content = r.json()["choices"][0]["message"]["content"]
+        content = orjson.loads(r.content)["choices"][0]["message"]["content"]
         clean = content.strip()
         log.info("Image caption: %d chars", len(clean))
         return {
@@ -83,3 +87,25 @@ def caption_image_bytes(
             "model": model,
             "method": "medgemma_vision_error",
         }
+
+
+def caption_image_bytes_batch(
+    items: list[tuple[bytes, str]],
+    *,
+    max_workers: int = 4,
+    **kwargs,
+) -> list[dict]:
+    """
+    Caption several (image_bytes, content_type) pairs.
+
+    The chat-completions endpoint takes one image per request, so the
+    requests are issued concurrently rather than as a single batch.
+    Results are returned in input order.
+    """
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as ex:
+        return list(ex.map(
+            lambda item: caption_image_bytes(item[0], content_type=item[1], **kwargs),
+            items,
+        ))
@@ -2,11 +2,12 @@
 Low-level LLM chat wrapper for the local MLX inference server.
 Used by structured_case.py for the normalize step.
 """
-import json
 import logging
 import re
 
-import requests
+import orjson
+
+from app.utils.http import llm_session
 
 log = logging.getLogger(__name__)
 
@@ -39,16 +40,16 @@ def medgemma_chat(prompt: str) -> str:
         "max_tokens": 800,
     }
 
-    r = requests.post(f"{MLX_URL}/chat/completions", json=payload, timeout=120)
+    r = llm_session.post(f"{MLX_URL}/chat/completions", json=payload, timeout=120)
     r.raise_for_status()
-    return r.json()["choices"][0]["message"]["content"]
+    return orjson.loads(r.content)["choices"][0]["message"]["content"]
 
 
 def medgemma_extract_json(prompt: str) -> dict:
     output = medgemma_chat(prompt)
     try:
         json_str = _extract_json(output)
-        return json.loads(json_str)
+        return orjson.loads(json_str)
     except Exception as e1:
         log.warning("JSON extraction attempt 1 failed: %s", e1)
         # retry with repair prompt
@@ -61,7 +62,7 @@ def medgemma_extract_json(prompt: str) -> dict:
         try:
             output2 = medgemma_chat(repair_prompt)
             json_str2 = _extract_json(output2)
-            return json.loads(json_str2)
+            return orjson.loads(json_str2)
         except Exception as e2:
             log.error("JSON extraction attempt 2 also failed: %s", e2)
             # Return a minimal valid dict so normalize doesn't 500
@@ -9,29 +9,30 @@ Production constraints:
   - Deterministic output (temperature=0)
   - Store transcript hash for caching
 """
-import hashlib
 import io
 import logging
-import re
 import tempfile
 import os
 
+from blake3 import blake3
+
+from app.utils.cache import format_digest
+
 log = logging.getLogger(__name__)
 
-_WS = re.compile(r"\s+")
-_CTRL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Control characters to drop (keeps \t, \n, \r for the whitespace pass)
+_CTRL_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20)])
 
 
 def _sanitize(text: str) -> str:
     """Remove control characters, normalize whitespace."""
-    text = _CTRL.sub("", text)
-    text = _WS.sub(" ", text).strip()
-    return text
+    text = text.translate(_CTRL_TABLE)
+    return " ".join(text.split())
 
 
 def compute_audio_hash(audio_bytes: bytes) -> str:
-    """SHA-256 hash of audio file bytes."""
-    return hashlib.sha256(audio_bytes).hexdigest()
+    """BLAKE3 hash of audio file bytes, in the b3:-prefixed cache-key format."""
+    return format_digest(blake3(audio_bytes))
 
 
 def transcribe_audio_bytes(audio_bytes: bytes, model_size: str = "base") -> dict:
@@ -41,23 +42,54 @@ def transcribe_audio_bytes(audio_bytes: bytes, model_size: str = "base") -> dict
     Returns:
         {"text": str, "model": str, "method": str}
     """
+    return transcribe_audio_bytes_batch([audio_bytes], model_size=model_size)[0]
+
+
+def transcribe_audio_bytes_batch(items: list[bytes], model_size: str = "base") -> list[dict]:
+    """
+    Transcribe several audio files with one Whisper model load.
+
+    Whisper has no batched transcribe(), so files still decode one after
+    another; the saving is loading the model once instead of per file.
+    Returns one {"text", "model", "method"} dict per item, in order.
+    """
+    if not items:
+        return []
+
     try:
         import whisper
     except ImportError:
         log.warning("Whisper not installed — using placeholder transcription")
-        return {
+        return [{
             "text": "[Audio transcription unavailable — whisper package not installed]",
             "model": "none",
             "method": "placeholder",
-        }
+        } for _ in items]
+
+    try:
+        model = whisper.load_model(model_size)
+    except Exception as e:
+        log.error("Whisper model load failed: %s", e)
+        return [_whisper_error(e, model_size) for _ in items]
+
+    return [_transcribe_with(model, model_size, audio_bytes) for audio_bytes in items]
+
+
+def _whisper_error(e: Exception, model_size: str) -> dict:
+    return {
+        "text": f"[Transcription failed: {e}]",
+        "model": f"whisper-{model_size}",
+        "method": "whisper_error",
+    }
 
+
+def _transcribe_with(model, model_size: str, audio_bytes: bytes) -> dict:
     # Write to temp file (whisper needs file path)
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
         tmp.write(audio_bytes)
         tmp_path = tmp.name
 
     try:
-        model = whisper.load_model(model_size)
         result = model.transcribe(tmp_path, temperature=0, language="en")
         raw_text = result.get("text", "")
         clean = _sanitize(raw_text)
@@ -68,11 +100,7 @@ def transcribe_audio_bytes(audio_bytes: bytes, model_size: str = "base") -> dict
         }
     except Exception as e:
         log.error("Whisper transcription failed: %s", e)
-        return {
-            "text": f"[Transcription failed: {e}]",
-            "model": f"whisper-{model_size}",
-            "method": "whisper_error",
-        }
+        return _whisper_error(e, model_size)
     finally:
         try:
             os.unlink(tmp_path)
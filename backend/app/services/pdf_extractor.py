@@ -3,12 +3,14 @@ import app.utils.object_store as object_store
 import app.models.models as model
 import app.db.database as db
 import io
-from fastapi import HTTPException
+import logging
 import os
 import dotenv
 
 loadenv=()
 
+log = logging.getLogger(__name__)
+
 def extract_text_from_pdf(pdf_bytes:bytes)->str:
     reader = PdfReader(io.BytesIO(pdf_bytes))
     parts = []
@@ -20,23 +22,28 @@ def extract_text_from_pdf(pdf_bytes:bytes)->str:
 
 
 def process_pdf_extraction(db_session:db, case_id:int):
-    docs = (db_session.query(model.CaseFiles).filter(model.CaseFiles.case_id == case_id).all())
-    for doc in docs:
-        if doc.content_type != "application/pdf":
-            continue
+    docs = (db_session.query(model.CaseFiles).filter(model.CaseFiles.case_id == case_id, model.CaseFiles.content_type == "application/pdf").all())
+    # One query for every already-extracted file instead of one per doc
+    existing_ids = {r[0] for r in db_session.query(model.CaseDocumentsText.file_id).filter(model.CaseDocumentsText.case_id == case_id, model.CaseDocumentsText.extraction_method == "pypdf").all()}
 
-        existing = (db_session.query(model.CaseDocumentsText).filter(model.CaseDocumentsText.case_id == case_id, model.CaseDocumentsText.file_id == doc.id,model.CaseDocumentsText.extraction_method == "pypdf").first())
-        if existing:
+    new_rows = []
+    failed = []
+    for doc in docs:
+        if doc.id in existing_ids:
             continue
         try:
             resp  = object_store.object_store.client.get_object(Bucket = os.getenv("S3_BUCKET_NAME"),Key = doc.object_key,)
             pdf_bytes = resp['Body'].read()
             extracted_text = extract_text_from_pdf(pdf_bytes)
-
         except Exception as e:
-            raise HTTPException(status_code = 400,detail = f"Error extracting PDF text: {str(e)}")
+            # Keep going so one bad file doesn't block the rest of the case
+            log.error("PDF extraction failed for file %d: %s", doc.id, e)
+            failed.append({"file_id": doc.id, "error": str(e)})
+            continue
+
+        new_rows.append(model.CaseDocumentsText(case_id = case_id,file_id = doc.id,extracted_text = extracted_text, extraction_method = "pypdf"))
 
-        case_doc_text = model.CaseDocumentsText(case_id = case_id,file_id = doc.id,extracted_text = extracted_text, extraction_method = "pypdf")
-        db_session.add(case_doc_text)
+    if new_rows:
+        db_session.add_all(new_rows)
         db_session.commit()
-    return {"message":"PDF text extraction completed"}
+    return {"message":"PDF text extraction completed", "extracted": len(new_rows), "failed": failed}
@@ -8,17 +8,19 @@ Wraps the full ingest pipeline with:
   - Resource preflight checks
 """
 import datetime
+import itertools
 import logging
 import os
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 import app.models.models as model
 import app.services.pdf_extractor as pdf_extractor
 from app.services.canonical_narrative import build_canonical_narrative
-from app.services.medasr_transcriber import transcribe_audio_bytes, compute_audio_hash
-from app.services.image_captioner import caption_image_bytes, compute_image_hash
+from app.services.medasr_transcriber import transcribe_audio_bytes_batch, compute_audio_hash
+from app.services.image_captioner import caption_image_bytes_batch, compute_image_hash
 from app.services.source_hashing import compute_source_hash
 import app.services.structured_case as structured_case_svc
 from app.services.cost_engine import compute_cost_estimate
@@ -27,6 +29,7 @@ from app.services.trust_report_builder import build_trust_report
 from app.services.builder import generate_case_analysis
 from app.services.runner import LLMRunner
 import app.utils.object_store as object_store
+from app.utils.job_progress import progress_store
 
 log = logging.getLogger(__name__)
 
@@ -35,6 +38,11 @@ MAX_AUDIO_BYTES = 50 * 1024 * 1024    # 50MB
 MAX_IMAGE_BYTES = 10 * 1024 * 1024    # 10MB
 MAX_PDF_PAGES = 50
 MAX_NARRATIVE_CHARS = 8000
+S3_PREFETCH_INFLIGHT = 4              # concurrent S3 downloads per stage
+
+# One long-lived client (and its connection pool) for every download
+_S3_CLIENT = object_store.object_store.client
+_S3_BUCKET = os.getenv("S3_BUCKET_NAME")
 
 DISCLAIMER = (
     "⚠ This system is for clinical decision support only. "
@@ -47,12 +55,103 @@ def _now():
     return datetime.datetime.utcnow()
 
 
-def _s3_get(object_key: str) -> bytes:
-    """Download object from S3."""
-    s3 = object_store.object_store.client
-    bucket = os.getenv("S3_BUCKET_NAME")
-    resp = s3.get_object(Bucket=bucket, Key=object_key)
-    return resp["Body"].read()
+class OversizedObject(ValueError):
+    """Raised when an S3 object is larger than the stage allows."""
+
+
+def _s3_get(object_key: str, max_bytes: int = None) -> bytes:
+    """
+    Download object from S3.
+
+    With max_bytes, oversized objects are rejected from ContentLength
+    before any of the body is read, and the read itself is capped.
+    """
+    resp = _S3_CLIENT.get_object(Bucket=_S3_BUCKET, Key=object_key)
+    body = resp["Body"]
+    if max_bytes is None:
+        return body.read()
+    if (resp.get("ContentLength") or 0) > max_bytes:
+        body.close()
+        raise OversizedObject(object_key)
+    data = body.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        body.close()
+        raise OversizedObject(object_key)
+    return data
+
+
+def _prefetch_objects(rows: list, max_bytes: int = None, max_inflight: int = S3_PREFETCH_INFLIGHT):
+    """
+    Download each row's object_key on a small thread pool.
+
+    Yields (row, bytes, error) in completion order, keeping at most
+    max_inflight downloads running so the next files are fetched while
+    the current one is transcribed/captioned.
+    """
+    remaining = iter(rows)
+    with ThreadPoolExecutor(max_workers=max_inflight) as ex:
+        inflight = {
+            ex.submit(_s3_get, row.object_key, max_bytes): row
+            for row in itertools.islice(remaining, max_inflight)
+        }
+        while inflight:
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                row = inflight.pop(fut)
+                nxt = next(remaining, None)
+                if nxt is not None:
+                    inflight[ex.submit(_s3_get, nxt.object_key, max_bytes)] = nxt
+                err = fut.exception()
+                yield row, (None if err else fut.result()), err
+
+
+def _transcribe_files(audio_files: list) -> tuple[list, list[str]]:
+    """
+    Download and transcribe audio files. Takes plain column rows and
+    touches no DB session, so it can run off the pipeline thread.
+
+    Returns ([(audio_file, audio_hash, result), ...], errors).
+    """
+    fetched, errors = [], []
+    for af, audio_bytes, fetch_error in _prefetch_objects(audio_files, MAX_AUDIO_BYTES):
+        if isinstance(fetch_error, OversizedObject):
+            errors.append(f"audio_{af.id}: exceeds {MAX_AUDIO_BYTES // (1024*1024)}MB limit")
+        elif fetch_error is not None:
+            errors.append(f"transcribe_audio_{af.id}: {fetch_error}")
+            log.error("Audio transcription failed for file %d: %s", af.id, fetch_error)
+        else:
+            fetched.append((af, audio_bytes))
+    # One model load for every file in the stage
+    results = transcribe_audio_bytes_batch([audio_bytes for _, audio_bytes in fetched])
+    return [
+        (af, compute_audio_hash(audio_bytes), result)
+        for (af, audio_bytes), result in zip(fetched, results)
+    ], errors
+
+
+def _caption_files(image_files: list) -> tuple[list, list[str]]:
+    """
+    Download and caption image files; the image counterpart of
+    _transcribe_files.
+
+    Returns ([(image_file, image_hash, result), ...], errors).
+    """
+    fetched, errors = [], []
+    for img, img_bytes, fetch_error in _prefetch_objects(image_files, MAX_IMAGE_BYTES):
+        if isinstance(fetch_error, OversizedObject):
+            errors.append(f"image_{img.id}: exceeds {MAX_IMAGE_BYTES // (1024*1024)}MB limit")
+        elif fetch_error is not None:
+            errors.append(f"caption_image_{img.id}: {fetch_error}")
+            log.error("Image captioning failed for file %d: %s", img.id, fetch_error)
+        else:
+            fetched.append((img, img_bytes))
+    results = caption_image_bytes_batch(
+        [(img_bytes, img.content_type) for img, img_bytes in fetched]
+    )
+    return [
+        (img, compute_image_hash(img_bytes), result)
+        for (img, img_bytes), result in zip(fetched, results)
+    ], errors
 
 
 def create_ingest_job(db: Session, case_id: int) -> int:
@@ -105,128 +204,169 @@ def run_full_ingest(db: Session, case_id: int, user_id: int, job_id: int = None)
     steps = []
     errors = []
 
+    published = None
+
     def _update_job_progress():
-        if job:
-            job.meta_data = {
+        nonlocal published
+        # Live progress goes to the progress store; the job row itself is
+        # only written when the job finishes or fails. Stages that added
+        # no step or error (e.g. nothing to transcribe) publish nothing.
+        marker = (len(steps), len(errors))
+        if job and marker != published:
+            published = marker
+            progress_store.set(job.id, {
                 "steps": list(steps),
                 "errors": list(errors),
                 "timings": dict(timings)
-            }
-            db.commit()
-            db.refresh(job)
+            })
 
     # ── 1. PDF Extraction ──
-    t0 = time.time()
+    t0 = time.perf_counter()
     try:
-        pdf_extractor.process_pdf_extraction(db, case_id)
+        pdf_result = pdf_extractor.process_pdf_extraction(db, case_id)
+        for f in pdf_result.get("failed", []):
+            errors.append(f"pdf_extraction_{f['file_id']}: {f['error']}")
         steps.append("pdf_extraction")
     except Exception as e:
         errors.append(f"pdf_extraction: {e}")
         log.error("PDF extraction failed: %s", e)
-    timings["pdf_extraction_ms"] = int((time.time() - t0) * 1000)
+    timings["pdf_extraction_ms"] = int((time.perf_counter() - t0) * 1000)
     _update_job_progress()
 
-    # ── 2. Audio Transcription ──
-    t0 = time.time()
+    # ── 2–3. Audio Transcription + Image Captioning ──
+    # The two stages are independent and bound by S3 and model calls, so
+    # their download/transcribe/caption work runs side by side on worker
+    # threads. Workers only get plain (id, object_key, content_type) rows,
+    # never ORM instances: the commits below expire the identity map, and
+    # the session must only be used from this thread.
+    def _stage_work(fn, rows):
+        t = time.perf_counter()
+        out = fn(rows)
+        return out, int((time.perf_counter() - t) * 1000)
+
+    t0 = time.perf_counter()
+    to_transcribe = None
     try:
-        audio_files = db.query(model.CaseAudioFile).filter(
+        audio_files = db.query(
+            model.CaseAudioFile.id, model.CaseAudioFile.object_key, model.CaseAudioFile.content_type
+        ).filter(
             model.CaseAudioFile.case_id == case_id
         ).all()
-        tx_count = 0
-        for af in audio_files:
-            existing = db.query(model.CaseAudioTranscript).filter(
-                model.CaseAudioTranscript.audio_file_id == af.id
-            ).first()
-            if existing:
-                tx_count += 1
-                continue
-            try:
-                audio_bytes = _s3_get(af.object_key)
-                if len(audio_bytes) > MAX_AUDIO_BYTES:
-                    errors.append(f"audio_{af.id}: exceeds {MAX_AUDIO_BYTES // (1024*1024)}MB limit")
-                    continue
-                result = transcribe_audio_bytes(audio_bytes)
-                tx = model.CaseAudioTranscript(
-                    case_id=case_id, audio_file_id=af.id,
-                    transcript_text=result["text"],
-                    extraction_method=result["method"],
-                    model_name=result["model"],
-                    source_hash=compute_audio_hash(audio_bytes),
-                )
-                db.add(tx)
-                db.commit()
-                tx_count += 1
-            except Exception as e:
-                errors.append(f"transcribe_audio_{af.id}: {e}")
-                log.error("Audio transcription failed for file %d: %s", af.id, e)
-        if tx_count > 0:
-            steps.append(f"transcription({tx_count})")
+        done_ids = {r[0] for r in db.query(model.CaseAudioTranscript.audio_file_id).filter(
+            model.CaseAudioTranscript.audio_file_id.in_([af.id for af in audio_files])
+        ).all()} if audio_files else set()
+        to_transcribe = [af for af in audio_files if af.id not in done_ids]
+        tx_count = len(audio_files) - len(to_transcribe)
     except Exception as e:
         errors.append(f"transcription: {e}")
         log.error("Transcription stage failed: %s", e)
-    timings["transcription_ms"] = int((time.time() - t0) * 1000)
-    _update_job_progress()
+    audio_prep_ms = int((time.perf_counter() - t0) * 1000)
 
-    # ── 3. Image Captioning ──
-    t0 = time.time()
+    t0 = time.perf_counter()
+    to_caption = None
     try:
-        image_files = db.query(model.CaseFiles).filter(
+        image_files = db.query(
+            model.CaseFiles.id, model.CaseFiles.object_key, model.CaseFiles.content_type
+        ).filter(
             model.CaseFiles.case_id == case_id,
             model.CaseFiles.content_type.in_(["image/png", "image/jpeg", "image/jpg"]),
         ).all()
-        cap_count = 0
-        for img in image_files:
-            existing = db.query(model.CaseImageFinding).filter(
-                model.CaseImageFinding.file_id == img.id
-            ).first()
-            if existing:
-                cap_count += 1
-                continue
-            try:
-                img_bytes = _s3_get(img.object_key)
-                if len(img_bytes) > MAX_IMAGE_BYTES:
-                    errors.append(f"image_{img.id}: exceeds {MAX_IMAGE_BYTES // (1024*1024)}MB limit")
-                    continue
-                result = caption_image_bytes(img_bytes, content_type=img.content_type)
-                finding = model.CaseImageFinding(
-                    case_id=case_id, file_id=img.id,
-                    caption_text=result["text"],
-                    extraction_method=result["method"],
-                    model_name=result["model"],
-                    source_hash=compute_image_hash(img_bytes),
-                )
-                db.add(finding)
-                db.commit()
-                cap_count += 1
-            except Exception as e:
-                errors.append(f"caption_image_{img.id}: {e}")
-                log.error("Image captioning failed for file %d: %s", img.id, e)
-        if cap_count > 0:
-            steps.append(f"captioning({cap_count})")
+        done_ids = {r[0] for r in db.query(model.CaseImageFinding.file_id).filter(
+            model.CaseImageFinding.file_id.in_([img.id for img in image_files])
+        ).all()} if image_files else set()
+        to_caption = [img for img in image_files if img.id not in done_ids]
+        cap_count = len(image_files) - len(to_caption)
     except Exception as e:
         errors.append(f"captioning: {e}")
         log.error("Captioning stage failed: %s", e)
-    timings["captioning_ms"] = int((time.time() - t0) * 1000)
-    _update_job_progress()
+    image_prep_ms = int((time.perf_counter() - t0) * 1000)
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        audio_future = ex.submit(_stage_work, _transcribe_files, to_transcribe) if to_transcribe is not None else None
+        image_future = ex.submit(_stage_work, _caption_files, to_caption) if to_caption is not None else None
+
+        if audio_future is not None:
+            t0 = time.perf_counter()
+            work_ms = 0
+            try:
+                (transcribed, stage_errors), work_ms = audio_future.result()
+                errors.extend(stage_errors)
+                new_txs = [
+                    model.CaseAudioTranscript(
+                        case_id=case_id, audio_file_id=af.id,
+                        transcript_text=result["text"],
+                        extraction_method=result["method"],
+                        model_name=result["model"],
+                        source_hash=audio_hash,
+                    )
+                    for af, audio_hash, result in transcribed
+                ]
+                tx_count += len(new_txs)
+                # One transaction for the whole stage
+                if new_txs:
+                    db.add_all(new_txs)
+                    db.commit()
+                if tx_count > 0:
+                    steps.append(f"transcription({tx_count})")
+            except Exception as e:
+                errors.append(f"transcription: {e}")
+                log.error("Transcription stage failed: %s", e)
+            timings["transcription_ms"] = audio_prep_ms + work_ms + int((time.perf_counter() - t0) * 1000)
+        else:
+            timings["transcription_ms"] = audio_prep_ms
+        _update_job_progress()
+
+        if image_future is not None:
+            t0 = time.perf_counter()
+            work_ms = 0
+            try:
+                (captioned, stage_errors), work_ms = image_future.result()
+                errors.extend(stage_errors)
+                new_findings = [
+                    model.CaseImageFinding(
+                        case_id=case_id, file_id=img.id,
+                        caption_text=result["text"],
+                        extraction_method=result["method"],
+                        model_name=result["model"],
+                        source_hash=image_hash,
+                    )
+                    for img, image_hash, result in captioned
+                ]
+                cap_count += len(new_findings)
+                if new_findings:
+                    db.add_all(new_findings)
+                    db.commit()
+                if cap_count > 0:
+                    steps.append(f"captioning({cap_count})")
+            except Exception as e:
+                errors.append(f"captioning: {e}")
+                log.error("Captioning stage failed: %s", e)
+            timings["captioning_ms"] = image_prep_ms + work_ms + int((time.perf_counter() - t0) * 1000)
+        else:
+            timings["captioning_ms"] = image_prep_ms
+        _update_job_progress()
 
     # ── 4. Normalize ──
-    t0 = time.time()
+    t0 = time.perf_counter()
     try:
+        # Reload the case together with everything stages 1–3 produced
+        case = db.query(model.Cases).options(
+            joinedload(model.Cases.documents),
+            selectinload(model.Cases.audio_transcripts),
+            selectinload(model.Cases.image_findings),
+        ).filter(
+            model.Cases.id == case_id,
+            model.Cases.created_by_user_id == user_id,
+        ).populate_existing().first()
         case_fields = {
             "age": case.age, "sex": case.sex,
             "chief_complaint": case.chief_complaint,
             "history_present_illness": case.history_present_illness,
         }
-        docs = db.query(model.CaseDocumentsText).filter(
-            model.CaseDocumentsText.case_id == case_id
-        ).all()
+        docs = case.documents
         extracted_docs = [{"file_id": d.file_id, "extracted_text": d.extracted_text} for d in docs]
-        transcripts = db.query(model.CaseAudioTranscript).filter(
-            model.CaseAudioTranscript.case_id == case_id
-        ).all()
-        image_findings = db.query(model.CaseImageFinding).filter(
-            model.CaseImageFinding.case_id == case_id
-        ).all()
+        transcripts = case.audio_transcripts
+        image_findings = case.image_findings
 
         transcript_texts = [t.transcript_text for t in transcripts]
         caption_texts = [f.caption_text for f in image_findings]
@@ -264,12 +404,13 @@ def run_full_ingest(db: Session, case_id: int, user_id: int, job_id: int = None)
         job.finished_at = _now()
         job.meta_data = {"timings": timings, "steps": steps, "errors": errors}
         db.commit()
+        progress_store.clear(job.id)
         return {"case_id": case_id, "job_id": job.id, "status": "failed", "errors": errors}
-    timings["normalization_ms"] = int((time.time() - t0) * 1000)
+    timings["normalization_ms"] = int((time.perf_counter() - t0) * 1000)
     _update_job_progress()
 
     # ── 5. Analyze ──
-    t0 = time.time()
+    t0 = time.perf_counter()
     try:
         runner = LLMRunner(
             base_url="http://localhost:8080/",
@@ -294,8 +435,9 @@ def run_full_ingest(db: Session, case_id: int, user_id: int, job_id: int = None)
         job.finished_at = _now()
         job.meta_data = {"timings": timings, "steps": steps, "errors": errors}
         db.commit()
+        progress_store.clear(job.id)
         return {"case_id": case_id, "job_id": job.id, "status": "failed", "errors": errors}
-    timings["analysis_ms"] = int((time.time() - t0) * 1000)
+    timings["analysis_ms"] = int((time.perf_counter() - t0) * 1000)
     _update_job_progress()
 
     result = {
@@ -307,79 +449,70 @@ def run_full_ingest(db: Session, case_id: int, user_id: int, job_id: int = None)
         "disclaimer": DISCLAIMER,
     }
 
-    # ── 6. Cost Estimate (failure-isolated) ──
-    t0 = time.time()
-    try:
-        est = compute_cost_estimate(analysis_row.analysis_data, struct_row.normalized_data)
-        est_data = est.model_dump()
-        # Persist
-        existing_est = db.query(model.CaseCostEstimate).filter(
-            model.CaseCostEstimate.case_id == case_id
-        ).first()
-        if existing_est:
-            existing_est.estimate_data = est_data
-            existing_est.source_hash = struct_row.source_hash
-        else:
-            db.add(model.CaseCostEstimate(
-                case_id=case_id, estimate_data=est_data, source_hash=struct_row.source_hash,
-            ))
-        db.commit()
-        result["cost_estimate"] = est_data
-        steps.append("cost_estimate")
-    except Exception as e:
-        errors.append(f"cost_estimate: {e}")
-        log.error("Cost estimate failed: %s", e)
-    timings["cost_estimate_ms"] = int((time.time() - t0) * 1000)
-    _update_job_progress()
-
-    # ── 7. Rare Spotlight (failure-isolated) ──
-    t0 = time.time()
-    try:
-        spot = compute_rare_spotlight(
-            struct_row.normalized_data, analysis_row.analysis_data, narrative,
-        )
-        spot_data = spot.model_dump()
-        existing_spot = db.query(model.CaseRareSpotlight).filter(
-            model.CaseRareSpotlight.case_id == case_id
-        ).first()
-        if existing_spot:
-            existing_spot.spotlight_data = spot_data
-            existing_spot.source_hash = struct_row.source_hash
-        else:
-            db.add(model.CaseRareSpotlight(
-                case_id=case_id, spotlight_data=spot_data, source_hash=struct_row.source_hash,
-            ))
-        db.commit()
-        result["rare_spotlight"] = spot_data
-        steps.append("rare_spotlight")
-    except Exception as e:
-        errors.append(f"rare_spotlight: {e}")
-        log.error("Rare spotlight failed: %s", e)
-    timings["spotlight_ms"] = int((time.time() - t0) * 1000)
-    _update_job_progress()
-
-    # ── 8. Trust Report (failure-isolated) ──
-    t0 = time.time()
-    try:
-        trust = build_trust_report(struct_row.normalized_data, analysis_row.analysis_data, narrative)
-        trust_data = trust.model_dump()
-        existing_trust = db.query(model.CaseTrustReport).filter(
-            model.CaseTrustReport.case_id == case_id
-        ).first()
-        if existing_trust:
-            existing_trust.trust_data = trust_data
-            existing_trust.source_hash = struct_row.source_hash
-        else:
-            db.add(model.CaseTrustReport(
-                case_id=case_id, trust_data=trust_data, source_hash=struct_row.source_hash,
-            ))
-        db.commit()
-        result["trust_report"] = trust_data
-        steps.append("trust_report")
-    except Exception as e:
-        errors.append(f"trust_report: {e}")
-        log.error("Trust report failed: %s", e)
-    timings["trust_ms"] = int((time.time() - t0) * 1000)
+    # ── 6–8. Cost Estimate / Rare Spotlight / Trust Report (failure-isolated) ──
+    # The three share the same inputs and write to separate tables, so the
+    # compute runs concurrently; DB writes stay on this thread because the
+    # session isn't thread-safe.
+    structured = struct_row.normalized_data
+    analysis_data = analysis_row.analysis_data
+    post_stages = [
+        # (step, timing key, table, data column, compute fn, args)
+        ("cost_estimate", "cost_estimate_ms", model.CaseCostEstimate, "estimate_data",
+         compute_cost_estimate, (analysis_data, structured)),
+        ("rare_spotlight", "spotlight_ms", model.CaseRareSpotlight, "spotlight_data",
+         compute_rare_spotlight, (structured, analysis_data, narrative)),
+        ("trust_report", "trust_ms", model.CaseTrustReport, "trust_data",
+         build_trust_report, (structured, analysis_data, narrative)),
+    ]
+
+    def _timed(fn, args):
+        t = time.perf_counter()
+        try:
+            out = fn(*args).model_dump()
+        except Exception as e:
+            out = e
+        return out, int((time.perf_counter() - t) * 1000)
+
+    # Same cache rule as the /estimate, /spotlight and /trust endpoints:
+    # a stored row for the current source_hash is reused as-is.
+    existing_rows = [
+        db.query(table).filter(table.case_id == case_id).first()
+        for _, _, table, *_ in post_stages
+    ]
+    stale = [
+        i for i, row in enumerate(existing_rows)
+        if not (row and row.source_hash == struct_row.source_hash)
+    ]
+    outcomes = {}
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale)) as ex:
+            futures = {i: ex.submit(_timed, *post_stages[i][4:]) for i in stale}
+            outcomes = {i: f.result() for i, f in futures.items()}
+
+    for i, (step, timing_key, table, column, _, _) in enumerate(post_stages):
+        existing_row = existing_rows[i]
+        if i not in outcomes:
+            result[step] = getattr(existing_row, column)
+            steps.append(step)
+            timings[timing_key] = 0
+            continue
+        data, elapsed_ms = outcomes[i]
+        t0 = time.perf_counter()
+        try:
+            if isinstance(data, Exception):
+                raise data
+            if existing_row:
+                setattr(existing_row, column, data)
+                existing_row.source_hash = struct_row.source_hash
+            else:
+                db.add(table(case_id=case_id, source_hash=struct_row.source_hash, **{column: data}))
+            db.commit()
+            result[step] = data
+            steps.append(step)
+        except Exception as e:
+            errors.append(f"{step}: {e}")
+            log.error("%s failed: %s", step, e)
+        timings[timing_key] = elapsed_ms + int((time.perf_counter() - t0) * 1000)
 
     # ── Finalize job ──
     total_ms = sum(timings.values())
@@ -393,6 +526,7 @@ def run_full_ingest(db: Session, case_id: int, user_id: int, job_id: int = None)
         "cache_hit": cache_hit,
     }
     db.commit()
+    progress_store.clear(job.id)
 
     result["steps_completed"] = steps
     result["timings"] = timings
@@ -9,10 +9,12 @@ import logging
 import time
 from typing import Optional
 
-import requests
+import orjson
 
 from app.schemas.schema_phase5 import RareSpotlight, RareCandidate
 from hallucination.normalize import norm_text
+from app.utils.http import llm_session
+from app.services.runner import unwrap_code_fence
 
 log = logging.getLogger(__name__)
 
@@ -61,25 +63,41 @@ Max 3 candidates. Only use findings from the case. Output ONLY JSON.
 """.strip()
 
 
+# Schema-constrained decoding; _extract_json still handles servers that ignore it
+SPOTLIGHT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "rare_spotlight", "schema": RareSpotlight.model_json_schema()},
+}
+
+_DECODER = json.JSONDecoder()
+
+
+def _dumps(obj) -> str:
+    """Compact JSON text for prompts and grounding (orjson, str() fallback)."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def _extract_json(text: str) -> dict:
     """Pull JSON from LLM response."""
-    import re
     s = text.strip()
     # Strip code fences
-    m = re.search(r"```(?:json)?\s*(.*?)\s*```", s, re.DOTALL)
-    if m:
-        s = m.group(1).strip()
+    fenced = unwrap_code_fence(s)
+    if fenced is not None:
+        s = fenced
     # Find first {
     start = s.find("{")
     if start == -1:
         raise ValueError("No JSON object found")
-    s = s[start:]
-    for end in range(len(s), 0, -1):
-        try:
-            return json.loads(s[:end])
-        except json.JSONDecodeError:
-            continue
-    raise ValueError("Could not parse JSON")
+    try:
+        obj, _ = _DECODER.raw_decode(s, start)
+    except json.JSONDecodeError:
+        raise ValueError("Could not parse JSON")
+    return obj
+
+
+def _tokens(s: str) -> set[str]:
+    """Split normalized text into words, ignoring sentence-final dots."""
+    return {w for w in (t.strip(".") for t in s.split()) if w}
 
 
 def _validate_evidence(
@@ -90,7 +108,9 @@ def _validate_evidence(
     """
     Evidence integrity check: move ungrounded supporting_evidence to missing_evidence.
     """
-    input_blob = (json.dumps(structured_case, default=str) + " " + narrative).lower()
+    input_blob = (_dumps(structured_case) + " " + narrative).lower()
+    # Tokenize once so the word-overlap check is set lookups, not blob scans
+    input_tokens = _tokens(norm_text(input_blob))
 
     for cand in candidates:
         grounded = []
@@ -101,8 +121,8 @@ def _validate_evidence(
                 grounded.append(ev)
             else:
                 # Check word overlap
-                ev_words = set(ev_norm.split())
-                overlap = sum(1 for w in ev_words if w in input_blob)
+                ev_words = _tokens(ev_norm)
+                overlap = len(ev_words & input_tokens)
                 if len(ev_words) > 0 and overlap / len(ev_words) >= 0.6:
                     grounded.append(ev)
                 else:
@@ -139,7 +159,7 @@ def compute_rare_spotlight(
     analysis_summary = "\n".join(summary_parts) if summary_parts else "No differentials identified."
 
     # Truncate structured case for context window
-    sc_json = json.dumps(structured_case, default=str)
+    sc_json = _dumps(structured_case)
     if len(sc_json) > 2000:
         sc_json = sc_json[:2000] + "..."
 
@@ -156,18 +176,19 @@ def compute_rare_spotlight(
             {"role": "system", "content": RARE_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ],
+        "response_format": SPOTLIGHT_RESPONSE_FORMAT,
     }
 
-    t0 = time.time()
+    t0 = time.perf_counter()
     try:
-        r = requests.post(
+        r = llm_session.post(
             f"{base_url.rstrip('/')}/chat/completions",
             json=payload,
             timeout=120,
         )
         r.raise_for_status()
-        content = r.json()["choices"][0]["message"]["content"]
-        latency_ms = int((time.time() - t0) * 1000)
+        content = orjson.loads(r.content)["choices"][0]["message"]["content"]
+        latency_ms = int((time.perf_counter() - t0) * 1000)
         log.info("Rare spotlight LLM: %d chars in %dms", len(content), latency_ms)
     except Exception as exc:
         log.error("Rare spotlight LLM failed: %s", exc)
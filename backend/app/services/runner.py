@@ -10,21 +10,46 @@ Key hardening measures for small (4B) models:
 """
 import json
 import logging
-import re
 import time
 
-import requests
+import orjson
+from pydantic import ValidationError
 
 from app.schemas.schemas import CaseAnalysisData
 from app.utils.prompts import SYSTEM_PROMPT_V1_1, USER_PROMPT_V1_1
+from app.utils.http import llm_session
 
 log = logging.getLogger(__name__)
 
 MAX_NARRATIVE_CHARS = 2000          # prevent context-window overflow on 4B models
-_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+_DECODER = json.JSONDecoder()
+
+# Ask the server for schema-constrained output so attempt 1 parses; the
+# fix-prompt retry below stays as a fallback for servers that ignore it.
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "case_analysis", "schema": CaseAnalysisData.model_json_schema()},
+}
 
 
 # ── JSON extraction ──────────────────────────────────────────────
+def unwrap_code_fence(text: str) -> str | None:
+    """
+    Body of the first ```/```json fenced block, stripped, or None.  Two
+    str.find scans: linear even when a reply is full of unmatched fences.
+    """
+    start = text.find("```")
+    if start == -1:
+        return None
+    start += 3
+    if text[start:start + 4].lower() == "json":
+        start += 4
+    end = text.find("```", start)
+    if end == -1:
+        return None
+    return text[start:end].strip()
+
+
 def extract_json_string(text: str) -> str:
     """Pull the first valid JSON object/array out of *text*.  Raises ValueError."""
     if not text:
@@ -33,16 +58,16 @@ def extract_json_string(text: str) -> str:
     s = text.strip()
 
     # 1) fenced code block
-    m = _JSON_BLOCK_RE.search(s)
-    if m:
-        s = m.group(1).strip()
+    fenced = unwrap_code_fence(s)
+    if fenced is not None:
+        s = fenced
 
     if s.startswith("{") or s.startswith("["):
         # fast path – try the whole thing first
         try:
-            json.loads(s)
+            orjson.loads(s)
             return s
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
     # 2) locate first { or [
@@ -52,16 +77,68 @@ def extract_json_string(text: str) -> str:
     start = min(starts)
 
     tail = s[start:]
-    # try progressively shrinking from end
-    for end in range(len(tail), 0, -1):
-        chunk = tail[:end].strip()
+    # decode the first complete value; anything after it is ignored
+    try:
+        _, end = _DECODER.raw_decode(tail)
+    except json.JSONDecodeError:
+        raise ValueError("Could not extract valid JSON from response")
+    return tail[:end]
+
+
+# ── Local repair ─────────────────────────────────────────────────
+# Required fields the builder stamps after analysis anyway; a missing one
+# gets an empty placeholder instead of costing an LLM retry.
+_STAMPED_FIELDS = {
+    ("meta", "prompt_version"),
+    ("input_hashes", "structred_source_hash"),
+    ("input_hashes", "narrative_hash"),
+}
+
+
+def _loc_path(loc: tuple) -> str:
+    """("top_differentials", 0, "name") → "top_differentials[0].name"."""
+    out = ""
+    for k in loc:
+        out += f"[{k}]" if isinstance(k, int) else (f".{k}" if out else str(k))
+    return out
+
+
+def _repair_analysis(data: dict, exc: ValidationError) -> list[str] | None:
+    """
+    Patch mechanical schema drift in parsed LLM output in place: scalars
+    where strings are expected are stringified, a bare string where a list
+    is expected is wrapped, forbidden extra keys are deleted, and missing
+    builder-stamped fields get a placeholder.  Returns the repaired field
+    paths, or None when any error needs the model (e.g. a differential
+    without a name) so the fix-prompt retry runs instead.
+    """
+    repaired: list[str] = []
+    for err in exc.errors():
+        loc = err["loc"]
+        if not loc:
+            return None
         try:
-            json.loads(chunk)
-            return chunk
-        except Exception:
-            continue
+            parent = data
+            for k in loc[:-1]:
+                parent = parent[k]
+        except (KeyError, IndexError, TypeError):
+            return None
+        key, kind = loc[-1], err["type"]
 
-    raise ValueError("Could not extract valid JSON from response")
+        if kind == "missing":
+            if loc not in _STAMPED_FIELDS:
+                return None
+            parent[key] = ""
+        elif kind == "extra_forbidden":
+            del parent[key]
+        elif kind == "string_type" and isinstance(parent[key], (int, float, bool)):
+            parent[key] = str(parent[key])
+        elif kind == "list_type" and isinstance(parent[key], str):
+            parent[key] = [parent[key]]
+        else:
+            return None
+        repaired.append(_loc_path(loc))
+    return repaired
 
 
 # ── Fallback builder ─────────────────────────────────────────────
@@ -105,8 +182,10 @@ class LLMRunner:
         if len(narrative) > MAX_NARRATIVE_CHARS:
             narrative = narrative[:MAX_NARRATIVE_CHARS] + "\n... [truncated]"
 
+        # Compact JSON, not the dict's repr: valid for the model and fewer tokens
+        case_json = orjson.dumps(structured_case, default=str).decode()
         user_prompt = USER_PROMPT_V1_1.format(
-            structured_case_json=structured_case,
+            structured_case_json=case_json,
             narrative_text=narrative,
         )
 
@@ -118,13 +197,14 @@ class LLMRunner:
                 {"role": "user", "content": user_prompt},
             ],
             "temperature": 0.1,
+            "response_format": ANALYSIS_RESPONSE_FORMAT,
         }
 
-        t0 = time.time()
+        t0 = time.perf_counter()
 
         # ── attempt 1 ──
         try:
-            r = requests.post(
+            r = llm_session.post(
                 f"{self.base_url}/chat/completions", json=payload, timeout=120
             )
             r.raise_for_status()
@@ -132,38 +212,53 @@ class LLMRunner:
             log.error("LLM request failed: %s", exc)
             return _build_fallback(narrative, str(exc)), 0
 
-        dt_ms = int((time.time() - t0) * 1000)
-        content = r.json()["choices"][0]["message"]["content"]
+        dt_ms = int((time.perf_counter() - t0) * 1000)
+        content = orjson.loads(r.content)["choices"][0]["message"]["content"]
         log.info("LLM attempt-1 length: %d chars", len(content))
-        print("=== LLM RAW OUTPUT (attempt 1) ===")
-        print(content[:500])
-        print("=== END ===")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("LLM attempt-1 raw (first 500): %s", content[:500])
 
         try:
             json_str = extract_json_string(content)
-            data = CaseAnalysisData.model_validate_json(json_str)
-            return data, dt_ms
+            parsed = orjson.loads(json_str)
+            return CaseAnalysisData.model_validate(parsed), dt_ms
+        except ValidationError as ve:
+            # valid JSON that drifted from the schema: try fixing it locally
+            # before paying for a second LLM round-trip
+            error1 = str(ve)
+            repaired = _repair_analysis(parsed, ve) if isinstance(parsed, dict) else None
+            if repaired is not None:
+                try:
+                    data = CaseAnalysisData.model_validate(parsed)
+                    log.info("Attempt-1 repaired locally: %s", ", ".join(repaired))
+                    data.contradiction_or_quality_issues.append(
+                        "[repair] LLM output fields coerced to the schema: " + ", ".join(repaired)
+                    )
+                    return data, dt_ms
+                except ValidationError:
+                    pass
+            log.warning("Attempt-1 validation failed: %s", ve)
         except Exception as e1:
+            error1 = str(e1)
             log.warning("Attempt-1 parse failed: %s", e1)
 
         # ── attempt 2 (fix prompt) ──
         try:
             payload["messages"].append({"role": "assistant", "content": content})
             payload["messages"].append(
-                {"role": "user", "content": FIX_PROMPT.format(error=str(e1))}
+                {"role": "user", "content": FIX_PROMPT.format(error=error1)}
             )
-            r2 = requests.post(
+            r2 = llm_session.post(
                 f"{self.base_url}/chat/completions", json=payload, timeout=120
             )
             r2.raise_for_status()
-            content2 = r2.json()["choices"][0]["message"]["content"]
+            content2 = orjson.loads(r2.content)["choices"][0]["message"]["content"]
             log.info("LLM attempt-2 length: %d chars", len(content2))
-            print("=== LLM RAW OUTPUT (attempt 2) ===")
-            print(content2[:500])
-            print("=== END ===")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("LLM attempt-2 raw (first 500): %s", content2[:500])
             json_str2 = extract_json_string(content2)
             data2 = CaseAnalysisData.model_validate_json(json_str2)
             return data2, dt_ms
         except Exception as e2:
             log.error("Attempt-2 also failed: %s – returning fallback", e2)
-            return _build_fallback(narrative, f"Attempt1: {e1} | Attempt2: {e2}"), dt_ms
\ No newline at end of file
+            return _build_fallback(narrative, f"Attempt1: {error1} | Attempt2: {e2}"), dt_ms
\ No newline at end of file
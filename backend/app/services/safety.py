@@ -6,11 +6,14 @@ Before returning analysis, scans for red-flag keywords in evidence
 and narrative. If found, overrides care_setting_recommendation to ED_now.
 """
 import logging
+
+import ahocorasick
+
 from app.schemas.schemas import CaseAnalysisData
 
 log = logging.getLogger(__name__)
 
-RED_FLAG_KEYWORDS = [
+RED_FLAG_KEYWORDS: tuple[str, ...] = tuple(kw.lower() for kw in (
     "hypotension",
     "systolic < 90",
     "sbp < 90",
@@ -39,7 +42,42 @@ RED_FLAG_KEYWORDS = [
     "oxygen saturation 89",
     "oxygen saturation 85",
     "gcs < 8",
-]
+))  # lowercased here because the scan blob is lowercased
+
+# One automaton over every keyword; scanning the blob once replaces a
+# substring search per keyword.
+_RED_FLAG_AC = ahocorasick.Automaton()
+for _kw in RED_FLAG_KEYWORDS:
+    _RED_FLAG_AC.add_word(_kw, _kw)
+_RED_FLAG_AC.make_automaton()
+
+
+_CASE_TEXT_FIELDS = ("chief_complaint", "history_present_illness")
+_CASE_LIST_FIELDS = ("symptoms", "exam_findings", "red_flags")
+
+
+def _flatten_case_text(structured_case: dict) -> str:
+    """
+    Join the clinically active string fields of the case for scanning.
+
+    Only presenting findings are included — not the dict repr of the whole
+    case, whose keys, negatives and family history only add noise.
+    """
+    parts: list[str] = []
+    append = parts.append
+    for field in _CASE_TEXT_FIELDS:
+        val = structured_case.get(field)
+        if val:
+            append(str(val))
+    for field in _CASE_LIST_FIELDS:
+        parts.extend(str(v) for v in structured_case.get(field) or [])
+    for lab in structured_case.get("abnormal_labs") or []:
+        if isinstance(lab, dict):
+            # name and value side by side so "spo2 < 90" style flags match
+            append(" ".join(str(lab[k]) for k in ("name", "value", "units") if lab.get(k)))
+        else:
+            append(str(lab))
+    return " ".join(parts)
 
 
 def apply_safety_escalation(
@@ -57,7 +95,7 @@ def apply_safety_escalation(
         return False  # already at highest level
 
     # Build a combined text blob to scan
-    blob_parts = [narrative, str(structured_case)]
+    blob_parts = [narrative, _flatten_case_text(structured_case)]
 
     # Also include evidence from differentials
     for dx in analysis_data.top_differentials:
@@ -74,7 +112,13 @@ def apply_safety_escalation(
 
     blob = " ".join(blob_parts).lower()
 
-    triggered = [kw for kw in RED_FLAG_KEYWORDS if kw in blob]
+    # The message only reports three keywords, so stop at the third
+    triggered: list[str] = []
+    for _, kw in _RED_FLAG_AC.iter(blob):
+        if kw not in triggered:
+            triggered.append(kw)
+            if len(triggered) >= 3:
+                break
 
     if triggered:
         old_setting = analysis_data.care_setting_recommendation
@@ -9,65 +9,58 @@ import re
 from typing import Any
 
 from app.schemas.schema_trust import SafetyFlag
+from app.services.symptom_index import SymptomIndex, build_symptom_index
 
 log = logging.getLogger(__name__)
 
 
-def _get_lab_value(structured_case: dict, lab_name: str) -> float | None:
-    """Extract a numeric lab value by name (case-insensitive)."""
+_NUM = re.compile(r"(\d+\.?\d*)")
+
+
+def _parse_labs(structured_case: dict) -> list[tuple[str, float]]:
+    """
+    Lowercased name + first numeric value for every lab that has one,
+    in case order. Built once per evaluation instead of per lookup.
+    """
+    labs: list[tuple[str, float]] = []
     for lab in structured_case.get("abnormal_labs", []):
         if not isinstance(lab, dict):
             continue
-        name = (lab.get("name") or "").lower()
-        if lab_name.lower() in name:
-            val = lab.get("value", "")
-            # Extract first number from value string
-            m = re.search(r"(\d+\.?\d*)", str(val))
-            if m:
-                return float(m.group(1))
+        # Extract first number from value string
+        m = _NUM.search(str(lab.get("value", "")))
+        if m:
+            labs.append(((lab.get("name") or "").lower(), float(m.group(1))))
+    return labs
+
+
+def _get_lab_value(labs: list[tuple[str, float]], lab_name: str) -> float | None:
+    """Numeric value of the first lab whose name contains lab_name."""
+    lab_name = lab_name.lower()
+    for name, value in labs:
+        if lab_name in name:
+            return value
     return None
 
 
-def _has_symptom(structured_case: dict, *keywords: str) -> tuple[bool, str]:
-    """Check if any keyword appears in symptoms, exam_findings, or chief_complaint."""
-    search_fields = {
-        "symptoms": structured_case.get("symptoms", []),
-        "exam_findings": structured_case.get("exam_findings", []),
-        "red_flags": structured_case.get("red_flags", []),
-    }
-
-    cc = structured_case.get("chief_complaint") or ""
-    hpi = structured_case.get("history_present_illness") or ""
-    text_blob = (cc + " " + hpi).lower()
-
-    for field_name, items in search_fields.items():
-        if isinstance(items, list):
-            for i, item in enumerate(items):
-                item_lower = str(item).lower()
-                for kw in keywords:
-                    if kw.lower() in item_lower:
-                        return True, f"structured_case.{field_name}[{i}]"
-
-    for kw in keywords:
-        if kw.lower() in text_blob:
-            return True, "structured_case.chief_complaint/hpi"
-
-    return False, ""
-
-
-def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
+def evaluate_safety_rules(
+    structured_case: dict,
+    symptom_index: SymptomIndex | None = None,
+) -> list[SafetyFlag]:
     """
     Run all deterministic safety rules against the case data.
     Returns severity-graded safety flags.
+
+    Pass a prebuilt symptom_index to reuse a scan already done for this case.
     """
     flags: list[SafetyFlag] = []
+    labs = _parse_labs(structured_case)
 
     # ── Vital Sign Rules ──
 
     # Hypoxia
-    spo2 = _get_lab_value(structured_case, "spo2")
+    spo2 = _get_lab_value(labs, "spo2")
     if spo2 is None:
-        spo2 = _get_lab_value(structured_case, "oxygen")
+        spo2 = _get_lab_value(labs, "oxygen")
     if spo2 is not None and spo2 <= 92:
         severity = "critical" if spo2 <= 88 else "high"
         flags.append(SafetyFlag(
@@ -80,7 +73,7 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
     # ── Lab Rules ──
 
     # Hyperkalemia
-    k = _get_lab_value(structured_case, "potassium")
+    k = _get_lab_value(labs, "potassium")
     if k is not None and k >= 5.5:
         severity = "critical" if k >= 6.5 else "high" if k >= 6.0 else "medium"
         flags.append(SafetyFlag(
@@ -91,7 +84,7 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Hyponatremia
-    na = _get_lab_value(structured_case, "sodium")
+    na = _get_lab_value(labs, "sodium")
     if na is not None and na <= 125:
         severity = "critical" if na <= 120 else "high"
         flags.append(SafetyFlag(
@@ -102,7 +95,7 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Elevated troponin
-    trop = _get_lab_value(structured_case, "troponin")
+    trop = _get_lab_value(labs, "troponin")
     if trop is not None and trop > 0.04:
         severity = "critical" if trop > 1.0 else "high" if trop > 0.1 else "medium"
         flags.append(SafetyFlag(
@@ -113,7 +106,7 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Elevated creatinine
-    cr = _get_lab_value(structured_case, "creatinine")
+    cr = _get_lab_value(labs, "creatinine")
     if cr is not None and cr > 2.0:
         severity = "high" if cr > 4.0 else "medium"
         flags.append(SafetyFlag(
@@ -124,9 +117,9 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Elevated WBC
-    wbc = _get_lab_value(structured_case, "wbc")
+    wbc = _get_lab_value(labs, "wbc")
     if wbc is None:
-        wbc = _get_lab_value(structured_case, "white blood")
+        wbc = _get_lab_value(labs, "white blood")
     if wbc is not None and wbc > 20:
         severity = "high" if wbc > 30 else "medium"
         flags.append(SafetyFlag(
@@ -137,7 +130,7 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Low platelets
-    plt = _get_lab_value(structured_case, "platelet")
+    plt = _get_lab_value(labs, "platelet")
     if plt is not None and plt < 50:
         severity = "critical" if plt < 20 else "high"
         flags.append(SafetyFlag(
@@ -148,10 +141,11 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # ── Compound Rules ──
+    symptoms = symptom_index or build_symptom_index(structured_case)
 
     # Chest pain + SOB + elevated troponin → ACS
-    has_cp, cp_path = _has_symptom(structured_case, "chest pain", "substernal", "crushing")
-    has_sob, sob_path = _has_symptom(structured_case, "shortness of breath", "dyspnea", "sob")
+    has_cp, cp_path = symptoms.has("chest_pain")
+    has_sob, sob_path = symptoms.has("dyspnea")
     if has_cp and trop is not None and trop > 0.04:
         flags.append(SafetyFlag(
             flag="ACS risk — chest pain with troponin elevation",
@@ -161,9 +155,9 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Proteinuria + low complement + cytopenias → lupus nephritis
-    has_prot, prot_path = _has_symptom(structured_case, "proteinuria", "protein in urine")
-    c3 = _get_lab_value(structured_case, "c3")
-    c4 = _get_lab_value(structured_case, "c4")
+    has_prot, prot_path = symptoms.has("proteinuria")
+    c3 = _get_lab_value(labs, "c3")
+    c4 = _get_lab_value(labs, "c4")
     low_comp = (c3 is not None and c3 < 80) or (c4 is not None and c4 < 15)
     if has_prot and low_comp:
         flags.append(SafetyFlag(
@@ -174,7 +168,7 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Altered mental status
-    has_ams, ams_path = _has_symptom(structured_case, "altered mental", "confusion", "obtunded", "unresponsive")
+    has_ams, ams_path = symptoms.has("altered_mental_status")
     if has_ams:
         flags.append(SafetyFlag(
             flag="Altered mental status",
@@ -184,8 +178,8 @@ def evaluate_safety_rules(structured_case: dict) -> list[SafetyFlag]:
         ))
 
     # Fever + immunosuppression
-    has_fever, fever_path = _has_symptom(structured_case, "fever", "febrile")
-    has_immuno, immuno_path = _has_symptom(structured_case, "immunosuppress", "transplant", "chemotherapy", "hiv")
+    has_fever, fever_path = symptoms.has("fever")
+    has_immuno, immuno_path = symptoms.has("immunosuppression")
     if has_fever and has_immuno:
         flags.append(SafetyFlag(
             flag="Febrile in immunocompromised patient",
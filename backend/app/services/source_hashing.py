@@ -4,10 +4,43 @@ Source hashing — deterministic content-based hashes for all modalities.
 Includes case fields, extracted documents, audio transcripts, and image captions
 so any new data triggers re-normalization cleanly.
 """
-import hashlib
-import json
 from typing import List, Dict, Any
 
+import orjson
+
+from app.utils.cache import canonical_json, new_hasher, format_digest
+
+
+def _update_json(h, obj: Any):
+    h.update(canonical_json(obj))
+
+
+def _update_list(h, items: List[Any]):
+    h.update(b"[")
+    for i, item in enumerate(items):
+        if i:
+            h.update(b",")
+        _update_json(h, item)
+    h.update(b"]")
+
+
+def _update_docs(h, docs: List[tuple]):
+    """
+    Documents have a fixed shape, so emit their canonical JSON directly
+    (keys already in sorted order) instead of building and key-sorting a
+    dict per document.
+    """
+    h.update(b"[")
+    for i, (file_id, text) in enumerate(docs):
+        if i:
+            h.update(b",")
+        h.update(b'{"extracted_text":')
+        h.update(orjson.dumps(text))
+        h.update(b',"file_id":')
+        h.update(orjson.dumps(file_id))
+        h.update(b"}")
+    h.update(b"]")
+
 
 def compute_source_hash(
     case_fields: Dict[str, Any],
@@ -17,7 +50,7 @@ def compute_source_hash(
     image_captions: List[str] | None = None,
 ) -> str:
     """
-    Compute SHA-256 hash of all case input data.
+    Compute a content hash (BLAKE3) of all case input data.
 
     Includes case fields, documents, audio transcripts, and image captions
     so any modality change triggers re-normalization.
@@ -27,25 +60,29 @@ def compute_source_hash(
         for k, v in case_fields.items()
     }
 
-    normalized_docs = []
-    for d in extracted_docs:
-        normalized_docs.append({
-            "file_id": d.get("file_id"),
-            "extracted_text": (d.get("extracted_text") or ""),
-        })
-    normalized_docs.sort(key=lambda x: (x["file_id"] is None, x["file_id"]))
-
-    payload = {
-        "schema_version": schema_version,
-        "case": normalized_case,
-        "documents": normalized_docs,
-    }
+    normalized_docs = [
+        (d.get("file_id"), d.get("extracted_text") or "")
+        for d in extracted_docs
+    ]
+    normalized_docs.sort(key=lambda x: (x[0] is None, x[0]))
 
+    # Stream the canonical JSON of the payload into the hasher piece by
+    # piece (same bytes as canonical_json(payload)) so large
+    # documents/transcripts are never joined into one buffer. Top-level
+    # keys are emitted in sorted order.
+    h = new_hasher()
+    h.update(b'{"case":')
+    _update_json(h, normalized_case)
+    h.update(b',"documents":')
+    _update_docs(h, normalized_docs)
     # Phase 7: include audio transcripts and image captions
-    if transcripts:
-        payload["transcripts"] = sorted(transcripts)
     if image_captions:
-        payload["image_captions"] = sorted(image_captions)
-
-    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
\ No newline at end of file
+        h.update(b',"image_captions":')
+        _update_list(h, sorted(image_captions))
+    h.update(b',"schema_version":')
+    _update_json(h, schema_version)
+    if transcripts:
+        h.update(b',"transcripts":')
+        _update_list(h, sorted(transcripts))
+    h.update(b"}")
+    return format_digest(h)
@@ -0,0 +1,60 @@
+"""
+Symptom Index — one keyword scan per case, shared by the trust-report
+components.
+
+Every compound-rule keyword is compiled into a single Aho-Corasick
+automaton; a case's symptoms, exam findings, red flags and chief
+complaint/HPI are scanned once and the first location of each keyword
+group is recorded.
+"""
+from dataclasses import dataclass, field
+
+import ahocorasick
+
+SYMPTOM_GROUPS: dict[str, tuple[str, ...]] = {
+    "chest_pain": ("chest pain", "substernal", "crushing"),
+    "dyspnea": ("shortness of breath", "dyspnea", "sob"),
+    "proteinuria": ("proteinuria", "protein in urine"),
+    "altered_mental_status": ("altered mental", "confusion", "obtunded", "unresponsive"),
+    "fever": ("fever", "febrile"),
+    "immunosuppression": ("immunosuppress", "transplant", "chemotherapy", "hiv"),
+}
+
+_SYMPTOM_AC = ahocorasick.Automaton()
+for _group, _keywords in SYMPTOM_GROUPS.items():
+    for _kw in _keywords:
+        _SYMPTOM_AC.add_word(_kw, _SYMPTOM_AC.get(_kw, []) + [_group])
+_SYMPTOM_AC.make_automaton()
+
+
+@dataclass
+class SymptomIndex:
+    """group name → source path of its first hit."""
+    hits: dict[str, str] = field(default_factory=dict)
+
+    def has(self, group: str) -> tuple[bool, str]:
+        path = self.hits.get(group)
+        return path is not None, path or ""
+
+
+def build_symptom_index(structured_case: dict) -> SymptomIndex:
+    """
+    Map each symptom group to the first place it appears: symptoms,
+    exam_findings and red_flags in order, then chief_complaint/hpi.
+    """
+    hits: dict[str, str] = {}
+    for field_name in ("symptoms", "exam_findings", "red_flags"):
+        items = structured_case.get(field_name, [])
+        if not isinstance(items, list):
+            continue
+        for i, item in enumerate(items):
+            for _, groups in _SYMPTOM_AC.iter(str(item).lower()):
+                for group in groups:
+                    hits.setdefault(group, f"structured_case.{field_name}[{i}]")
+
+    cc = structured_case.get("chief_complaint") or ""
+    hpi = structured_case.get("history_present_illness") or ""
+    for _, groups in _SYMPTOM_AC.iter((cc + " " + hpi).lower()):
+        for group in groups:
+            hits.setdefault(group, "structured_case.chief_complaint/hpi")
+    return SymptomIndex(hits)
@@ -14,6 +14,7 @@ import logging
 from app.schemas.schema_trust import TrustReport
 from app.services.evidence_verifier import verify_analysis
 from app.services.safety_rules import evaluate_safety_rules
+from app.services.symptom_index import build_symptom_index
 from app.services.uncertainty_scoring import score_all
 
 log = logging.getLogger(__name__)
@@ -31,27 +32,42 @@ def build_trust_report(
     # 1. Verify evidence claims
     diagnoses = verify_analysis(analysis_data, structured_case, narrative)
 
-    # 2. Run safety rules
-    safety_flags = evaluate_safety_rules(structured_case)
+    # 2. Run safety rules (symptom keywords scanned once per case)
+    symptom_index = build_symptom_index(structured_case)
+    safety_flags = evaluate_safety_rules(structured_case, symptom_index)
 
     # 3. Score confidence
     scored_diagnoses = score_all(diagnoses, structured_case, analysis_data, safety_flags)
 
-    # 4. Compute overall metrics
-    if scored_diagnoses:
-        overall_support = sum(d.support_ratio for d in scored_diagnoses) / len(scored_diagnoses)
-        overall_confidence = sum(d.confidence_score for d in scored_diagnoses) // len(scored_diagnoses)
-    else:
-        overall_support = 0.0
-        overall_confidence = 0
+    # 4. Compute overall metrics (one pass over diagnoses and their links)
+    tot_support = 0.0
+    tot_conf = 0
+    total_claims = 0
+    supported_claims = 0
+    unsupported_warnings: list[str] = []
+    for d in scored_diagnoses:
+        tot_support += d.support_ratio
+        tot_conf += d.confidence_score
+        for ev in d.evidence_links:
+            total_claims += 1
+            if ev.supported:
+                supported_claims += 1
+            else:
+                unsupported_warnings.append(
+                    f"Unsupported claim in {d.diagnosis}: \"{ev.claim[:80]}\""
+                )
 
-    total_claims = sum(len(d.evidence_links) for d in scored_diagnoses)
-    supported_claims = sum(
-        sum(1 for e in d.evidence_links if e.supported) for d in scored_diagnoses
-    )
+    n = len(scored_diagnoses)
+    overall_support = tot_support / n if n else 0.0
+    overall_confidence = tot_conf // n if n else 0
     unsupported_claims = total_claims - supported_claims
-    critical_flags = [f for f in safety_flags if f.severity in ("critical",)]
-    high_flags = [f for f in safety_flags if f.severity in ("high",)]
+    critical_flags = []
+    high_flags = []
+    for f in safety_flags:
+        if f.severity == "critical":
+            critical_flags.append(f)
+        elif f.severity == "high":
+            high_flags.append(f)
 
     # 5. Determine overall status
     global_warnings: list[str] = []
@@ -80,12 +96,7 @@ def build_trust_report(
             global_warnings.append(f"Safety concern: {f.flag}")
 
     # Add unsupported claim details
-    for dx in scored_diagnoses:
-        for ev in dx.evidence_links:
-            if not ev.supported:
-                global_warnings.append(
-                    f"Unsupported claim in {dx.diagnosis}: \"{ev.claim[:80]}\""
-                )
+    global_warnings.extend(unsupported_warnings)
 
     report = TrustReport(
         status=status,
@@ -18,31 +18,25 @@ from app.schemas.schema_trust import DiagnosisTrust, SafetyFlag
 
 log = logging.getLogger(__name__)
 
+_ESCALATING_SEVERITIES = frozenset(("critical", "high"))
 
-def score_diagnosis(
-    dx_trust: DiagnosisTrust,
+
+def _case_signals(
     structured_case: dict,
     analysis_data: dict,
     safety_flags: list[SafetyFlag],
-) -> DiagnosisTrust:
+) -> tuple[int, list[str]]:
     """
-    Compute deterministic confidence score for a single diagnosis.
-    Mutates and returns dx_trust with scored fields.
+    Score adjustments that depend only on the case, not on the diagnosis.
+    Returns (score delta, uncertainty reasons).
     """
-    score = 50
+    delta = 0
     reasons: list[str] = []
 
-    # ── Positive signals ──
-
-    # +5 per supported evidence item (cap +30)
-    supported = sum(1 for e in dx_trust.evidence_links if e.supported)
-    ev_bonus = min(supported * 5, 30)
-    score += ev_bonus
-
     # +10 if ≥3 abnormal labs
     labs = structured_case.get("abnormal_labs", [])
     if len(labs) >= 3:
-        score += 10
+        delta += 10
 
     # +10 if clear timeline exists
     timeline = structured_case.get("timeline", {})
@@ -50,31 +44,62 @@ def score_diagnosis(
         has_onset = bool(timeline.get("onset"))
         has_duration = bool(timeline.get("duration"))
         if has_onset and has_duration:
-            score += 10
-
-    # ── Negative signals ──
+            delta += 10
 
     # -10 if significant missing info
     missing = analysis_data.get("missing_info", [])
     if isinstance(missing, list) and len(missing) >= 2:
-        score -= 10
+        delta -= 10
         for m in missing[:3]:
             reasons.append(f"Missing: {m}")
 
     # -15 if safety red flags but no confirmatory data
-    critical_flags = [f for f in safety_flags if f.severity in ("critical", "high")]
-    if critical_flags and len(labs) < 2:
-        score -= 15
+    has_critical = any(f.severity in _ESCALATING_SEVERITIES for f in safety_flags)
+    if has_critical and len(labs) < 2:
+        delta -= 15
         reasons.append("Critical safety flags without sufficient confirmatory labs")
 
+    return delta, reasons
+
+
+def score_diagnosis(
+    dx_trust: DiagnosisTrust,
+    structured_case: dict,
+    analysis_data: dict,
+    safety_flags: list[SafetyFlag],
+    case_signals: tuple[int, list[str]] | None = None,
+) -> DiagnosisTrust:
+    """
+    Compute deterministic confidence score for a single diagnosis.
+    Mutates and returns dx_trust with scored fields.
+
+    case_signals lets score_all pass the case-level part computed once.
+    """
+    if case_signals is None:
+        case_signals = _case_signals(structured_case, analysis_data, safety_flags)
+    case_delta, case_reasons = case_signals
+
+    score = 50 + case_delta
+    reasons: list[str] = list(case_reasons)
+
+    # Count supported/unsupported links in one pass
+    supported = 0
+    unsupported_count = 0
+    for e in dx_trust.evidence_links:
+        if e.supported:
+            supported += 1
+        else:
+            unsupported_count += 1
+
+    # +5 per supported evidence item (cap +30)
+    score += min(supported * 5, 30)
+
     # -20 if support ratio < 0.5
     if dx_trust.support_ratio < 0.5:
         score -= 20
-        unsupported = [e.claim for e in dx_trust.evidence_links if not e.supported]
-        reasons.append(f"Low evidence grounding ({dx_trust.support_ratio:.0%}) — {len(unsupported)} unsupported claims")
+        reasons.append(f"Low evidence grounding ({dx_trust.support_ratio:.0%}) — {unsupported_count} unsupported claims")
 
     # -5 per unsupported evidence claim
-    unsupported_count = sum(1 for e in dx_trust.evidence_links if not e.supported)
     score -= unsupported_count * 5
 
     # Clamp 0–100
@@ -105,8 +130,9 @@ def score_all(
     safety_flags: list[SafetyFlag],
 ) -> list[DiagnosisTrust]:
     """Score all diagnoses and return updated list."""
+    case_signals = _case_signals(structured_case, analysis_data, safety_flags)
     for dx in diagnoses:
-        score_diagnosis(dx, structured_case, analysis_data, safety_flags)
+        score_diagnosis(dx, structured_case, analysis_data, safety_flags, case_signals)
 
     if diagnoses:
         avg = sum(d.confidence_score for d in diagnoses) / len(diagnoses)
@@ -66,9 +66,11 @@ def enforce_analysis_rules(data: CaseAnalysisData) -> list[str]:
 
     # Append all warnings to the analysis data itself
     if warnings:
+        existing = set(data.contradiction_or_quality_issues)
         for w in warnings:
             log.warning("Analysis quality: %s", w)
-            if w not in data.contradiction_or_quality_issues:
+            if w not in existing:
+                existing.add(w)
                 data.contradiction_or_quality_issues.append(w)
 
     return warnings
\ No newline at end of file
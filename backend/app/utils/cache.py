@@ -1,8 +1,23 @@
-import hashlib, json
+import orjson
+from blake3 import blake3
+
+# Cache keys only need change detection, not collision resistance against
+# an attacker, so BLAKE3 is used. The prefix keeps new keys distinct from
+# the bare SHA-256 digests stored on older rows (those simply miss once).
+HASH_ALGO = "b3"
+
+def new_hasher():
+    return blake3()
+
+def format_digest(h)->str:
+    return f"{HASH_ALGO}:{h.hexdigest()}"
+
+def canonical_json(obj)->bytes:
+    """Sorted-key compact JSON bytes; the canonical form all cache keys hash."""
+    return orjson.dumps(obj,option=orjson.OPT_SORT_KEYS|orjson.OPT_NON_STR_KEYS)
 
 def stable_hash(obj:dict)->str:
-    blob = json.dumps(obj,sort_keys=True,separators=(",",":")).encode('utf-8')
-    return hashlib.sha256(blob).hexdigest()
+    return format_digest(blake3(canonical_json(obj)))
 
 def compute_analysis_source_hash(*,structured_source_hash:str,narrative:str,analysis_version:str)->str:
     payload = {
@@ -0,0 +1,19 @@
+"""
+Shared HTTP session for calls to the LLM / vision servers.
+
+Reusing one pooled session keeps connections alive between calls instead
+of opening a new TCP (and TLS) connection per request.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+llm_session = _build_session()
@@ -0,0 +1,54 @@
+"""
+Job progress store — live per-stage progress for running pipeline jobs.
+
+While a job runs its steps/errors/timings live here instead of being
+re-committed to case_jobs.meta_data after every stage; the job row is
+only written when the job finishes or fails. Uses Redis when REDIS_URL
+is set (so any worker can answer /jobs/{id}), otherwise an in-process dict.
+"""
+import json
+import os
+import threading
+from typing import Optional
+
+PROGRESS_TTL_SECONDS = 3600
+
+
+class JobProgressStore:
+    """In-process backend; only visible to the worker running the job."""
+
+    def __init__(self):
+        self._data: dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def set(self, job_id: int, progress: dict):
+        with self._lock:
+            self._data[job_id] = progress
+
+    def get(self, job_id: int) -> Optional[dict]:
+        with self._lock:
+            return self._data.get(job_id)
+
+    def clear(self, job_id: int):
+        with self._lock:
+            self._data.pop(job_id, None)
+
+
+class RedisJobProgressStore(JobProgressStore):
+    def __init__(self, url: str):
+        import redis  # only needed when REDIS_URL is configured
+        self._client = redis.Redis.from_url(url)
+
+    def set(self, job_id: int, progress: dict):
+        self._client.set(f"job:{job_id}", json.dumps(progress), ex=PROGRESS_TTL_SECONDS)
+
+    def get(self, job_id: int) -> Optional[dict]:
+        raw = self._client.get(f"job:{job_id}")
+        return json.loads(raw) if raw else None
+
+    def clear(self, job_id: int):
+        self._client.delete(f"job:{job_id}")
+
+
+_redis_url = os.getenv("REDIS_URL")
+progress_store = RedisJobProgressStore(_redis_url) if _redis_url else JobProgressStore()
@@ -11,7 +11,9 @@ class ObjectStore:
         endpoint_url = os.getenv("S3_ENDPOINT"),
         aws_access_key_id = os.getenv("S3_ACCESS_KEY"),
         aws_secret_access_key = os.getenv("S3_SECRET_KEY"),
-        region_name = os.getenv("S3_REGION")
+        region_name = os.getenv("S3_REGION"),
+        # enough pooled connections for the pipeline's parallel prefetch
+        config = Config(max_pool_connections=16)
         )
 
     def ensure_bucket_exists(self):
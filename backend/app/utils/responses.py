@@ -0,0 +1,15 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson. Routes that return large JSONB
+    payloads return it directly, which also skips FastAPI's
+    jsonable_encoder walk over the dict (orjson handles datetimes itself).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -13,7 +13,6 @@ class HallucinationConfig(BaseModel):
     # Matching thresholds
     min_ngram_hit_score: float = 0.78     # token overlap / Jaccard score
     min_numeric_hit_score: float = 0.90   # numbers/labs should match strongly
-    max_hits_per_claim: int = 3
 
     # What to scan besides support/against
     check_rationale: bool = True
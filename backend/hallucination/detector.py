@@ -14,46 +14,74 @@ import logging
 from typing import Any, Dict, List, Optional, Tuple
 
 from .config import HallucinationConfig
-from .index import build_evidence_index, EvidenceItem
-from .normalize import norm_text
-from .rules import token_jaccard, token_containment, numeric_compatible, is_generic_advice
-from .report import HallucinationReport, Finding, EvidenceHit
+from .index import get_evidence_index, EvidenceItem
+from .normalize import extract_number_set, norm_text
+from .rules import is_generic_advice
+from .report import HallucinationReport, Finding
 
 log = logging.getLogger(__name__)
 
 
 # ── Matching ──────────────────────────────────────────────────────
 
-def _best_hits(
+def _min_overlap(n_claim: int, threshold: float) -> int:
+    """Smallest shared-token count m with m / n_claim >= threshold."""
+    m = max(0, int(threshold * n_claim))
+    while m <= n_claim and m / n_claim < threshold:
+        m += 1
+    while m > 0 and (m - 1) / n_claim >= threshold:
+        m -= 1
+    return m
+
+
+def _has_hit(
     claim_norm: str,
     evidence: List[EvidenceItem],
+    postings: Dict[str, List[int]],
     cfg: HallucinationConfig,
-) -> List[EvidenceHit]:
-    """Find the best matching evidence items for a claim."""
-    hits: List[EvidenceHit] = []
-
-    for it in evidence:
-        if not it.norm:
+) -> bool:
+    """True as soon as any evidence item grounds the claim."""
+    claim_tokens = set(claim_norm.split())
+    n_claim = len(claim_tokens)
+    if not n_claim:
+        return False
+
+    # Containment (|claim ∩ item| / |claim|) is never below Jaccard, so the
+    # score is the containment and a hit needs at least m shared tokens —
+    # which also rules out any item with fewer than m tokens.
+    m = _min_overlap(n_claim, cfg.min_ngram_hit_score)
+    if m > n_claim:
+        return False
+    present = sorted(
+        (t for t in claim_tokens if t in postings), key=lambda t: len(postings[t])
+    )
+    if len(present) < max(m, 1):
+        return False
+
+    # Prefix filter: an item sharing m tokens must contain at least one of
+    # any len(present) - m + 1 of them, so only the rarest tokens' posting
+    # lists are needed to generate candidates.
+    candidates: set = set()
+    for tok in present[:len(present) - max(m, 1) + 1]:
+        candidates.update(postings[tok])
+
+    claim_nums = extract_number_set(claim_norm)
+    for idx in candidates:
+        it = evidence[idx]
+        if len(it.tokens) < m:
             continue
-
+        inter = len(claim_tokens & it.tokens)
         # Use the max of Jaccard and containment (containment is better
         # when evidence text is much longer than the claim)
-        j_score = token_jaccard(claim_norm, it.norm)
-        c_score = token_containment(claim_norm, it.norm)
-        score = max(j_score, c_score)
-
-        if score >= cfg.min_ngram_hit_score:
-            # Also check numeric compatibility — fabricated numbers are caught here
-            if numeric_compatible(claim_norm, it.norm):
-                hits.append(EvidenceHit(
-                    source=it.source,
-                    path=it.path,
-                    snippet=it.raw[:200],
-                    score=round(float(score), 3),
-                ))
+        j_score = inter / (n_claim + len(it.tokens) - inter)
+        c_score = inter / n_claim
+        score = c_score if c_score > j_score else j_score
 
-    hits.sort(key=lambda h: h.score, reverse=True)
-    return hits[:cfg.max_hits_per_claim]
+        # Also check numeric compatibility — every number in the claim
+        # must appear in the evidence; fabricated numbers are caught here
+        if score >= cfg.min_ngram_hit_score and claim_nums <= it.nums:
+            return True
+    return False
 
 
 # ── Claim Extraction ─────────────────────────────────────────────
@@ -161,6 +189,7 @@ def detect_hallucinations(
     analysis_data: Dict[str, Any],
     documents: Optional[List[str]] = None,
     cfg: Optional[HallucinationConfig] = None,
+    source_hash: Optional[str] = None,
 ) -> HallucinationReport:
     """
     Run hallucination detection on analysis output.
@@ -171,6 +200,8 @@ def detect_hallucinations(
         analysis_data: The CaseAnalysisData as a dict (model_dump())
         documents: Optional list of extracted document texts
         cfg: Configuration (defaults to warn mode)
+        source_hash: Content hash of the inputs above; reuses a cached
+            evidence index when the same inputs are checked again
 
     Returns:
         HallucinationReport with ok/score/findings/stats
@@ -182,13 +213,18 @@ def detect_hallucinations(
             ok=True, score=1.0, findings=[], stats={"mode": "off"}
         )
 
-    # Build evidence index from all input sources
-    evidence_index = build_evidence_index(structured_case, narrative, documents)
+    # Build (or reuse) the evidence index from all input sources
+    evidence_index, postings = get_evidence_index(
+        source_hash, structured_case, narrative, documents
+    )
     log.info("Evidence index: %d items", len(evidence_index))
 
     findings: List[Finding] = []
     total_checked = 0
     grounded = 0
+    # Claims repeat across differentials and sections; match each distinct
+    # normalized claim against the index once per report.
+    matched: Dict[str, bool] = {}
 
     for category, claim in _iter_claims_from_analysis(analysis_data, cfg):
         total_checked += 1
@@ -206,9 +242,11 @@ def detect_hallucinations(
             grounded += 1
             continue
 
-        # Find matching evidence
-        hits = _best_hits(claim_norm, evidence_index, cfg)
-        if hits:
+        # Any matching evidence grounds the claim (findings carry no hits)
+        hit = matched.get(claim_norm)
+        if hit is None:
+            hit = matched[claim_norm] = _has_hit(claim_norm, evidence_index, postings, cfg)
+        if hit:
             grounded += 1
             continue
 
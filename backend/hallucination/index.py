@@ -7,10 +7,13 @@ Sources:
   - narrative → sentence-level splits
   - documents → optional extracted doc text chunks
 """
+import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Literal, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Tuple
 
-from .normalize import norm_text
+from .normalize import extract_number_set, norm_text
 
 Source = Literal["structured", "narrative", "document"]
 
@@ -21,28 +24,75 @@ class EvidenceItem:
     path: Optional[str]
     raw: str
     norm: str
+    tokens: FrozenSet[str] = frozenset()
+    nums: FrozenSet[float] = frozenset()
+
+
+def _item(source: Source, path: Optional[str], raw: str) -> EvidenceItem:
+    """Normalize once and keep the token and number sets for matching."""
+    norm = norm_text(raw)
+    return EvidenceItem(
+        source=source, path=path, raw=raw, norm=norm,
+        tokens=frozenset(norm.split()), nums=extract_number_set(norm),
+    )
+
+
+# A period ends a sentence unless it sits between digits ("0.45")
+_SENTENCE_END = re.compile(r"(?<!\d)\.|\.(?!\d)")
+
+
+def _add_text(
+    items: List[EvidenceItem],
+    source: Source,
+    path: Optional[str],
+    text: str,
+):
+    """Full text plus its sentence-level splits."""
+    items.append(_item(source, path, text))
+    for part in _SENTENCE_END.split(text):
+        part = part.strip()
+        if len(part) > 3:
+            items.append(_item(source, path, part))
+
+
+def _dedupe(items: List[EvidenceItem]) -> List[EvidenceItem]:
+    """
+    One item per normalized text; duplicates score identically. Prefers an
+    item with a path, then the longest raw snippet; keeps first-seen order.
+    """
+    by_norm: Dict[str, EvidenceItem] = {}
+    for it in items:
+        if not it.norm:
+            continue  # no tokens, can never match
+        cur = by_norm.get(it.norm)
+        if cur is None or (it.path is not None, len(it.raw)) > (cur.path is not None, len(cur.raw)):
+            by_norm[it.norm] = it
+    return list(by_norm.values())
 
 
 def _flatten_structured(obj: Any, prefix: str = "") -> List[Tuple[str, str]]:
     """
-    Recursively flatten a nested dict/list into (path, string_value) pairs.
-    Only strings and primitive values become evidence strings.
+    Flatten a nested dict/list into (path, string_value) pairs, depth-first
+    in key/list order. Only strings and primitive values become evidence
+    strings. Walks an explicit stack instead of recursing per node.
     """
     out: List[Tuple[str, str]] = []
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            p = f"{prefix}.{k}" if prefix else str(k)
-            out.extend(_flatten_structured(v, p))
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            p = f"{prefix}[{i}]"
-            out.extend(_flatten_structured(v, p))
-    else:
-        if obj is None:
-            return out
-        s = str(obj).strip()
-        if s:
-            out.append((prefix, s))
+    stack: List[Tuple[str, Any]] = [(prefix, obj)]
+    pop, push = stack.pop, stack.extend
+    while stack:
+        prefix, cur = pop()
+        if isinstance(cur, dict):
+            # pushed reversed so they pop in original order
+            push([
+                (f"{prefix}.{k}" if prefix else str(k), v)
+                for k, v in reversed(cur.items())
+            ])
+        elif isinstance(cur, list):
+            push([(f"{prefix}[{i}]", cur[i]) for i in range(len(cur) - 1, -1, -1)])
+        elif cur is not None:
+            s = str(cur).strip()
+            if s:
+                out.append((prefix, s))
     return out
 
 
@@ -56,38 +106,64 @@ def build_evidence_index(
 
     # ── Structured case ──
     for path, val in _flatten_structured(structured_case):
-        items.append(EvidenceItem(
-            source="structured", path=path, raw=val, norm=norm_text(val)
-        ))
+        items.append(_item("structured", path, val))
 
     # ── Narrative (full + sentence-level splits) ──
     if narrative:
-        items.append(EvidenceItem(
-            source="narrative", path=None, raw=narrative, norm=norm_text(narrative)
-        ))
-        # Split on sentence boundaries
-        for part in narrative.split("."):
-            part = part.strip()
-            if len(part) > 3:
-                items.append(EvidenceItem(
-                    source="narrative", path=None, raw=part, norm=norm_text(part)
-                ))
+        _add_text(items, "narrative", None, narrative)
 
     # ── Documents (optional) ──
     if documents:
         for idx, doc in enumerate(documents):
             if not doc:
                 continue
-            items.append(EvidenceItem(
-                source="document", path=f"documents[{idx}]",
-                raw=doc, norm=norm_text(doc)
-            ))
-            for part in doc.split("."):
-                part = part.strip()
-                if len(part) > 3:
-                    items.append(EvidenceItem(
-                        source="document", path=f"documents[{idx}]",
-                        raw=part, norm=norm_text(part)
-                    ))
-
-    return items
+            _add_text(items, "document", f"documents[{idx}]", doc)
+
+    return _dedupe(items)
+
+
+def build_postings(items: List[EvidenceItem]) -> Dict[str, List[int]]:
+    """Inverted index: token → indices of the evidence items containing it."""
+    postings: Dict[str, List[int]] = {}
+    for idx, it in enumerate(items):
+        for tok in it.tokens:
+            postings.setdefault(tok, []).append(idx)
+    return postings
+
+
+# Recently built (items, postings) keyed by the caller's content hash.
+# Keys change whenever the inputs do, so entries never go stale; the
+# bound just caps memory. Guarded because pipeline stages run on threads.
+INDEX_CACHE_SIZE = 64
+_index_cache: "OrderedDict[str, Tuple[List[EvidenceItem], Dict[str, List[int]]]]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_evidence_index(
+    source_hash: Optional[str],
+    structured_case: Dict[str, Any],
+    narrative: str,
+    documents: Optional[List[str]] = None,
+) -> Tuple[List[EvidenceItem], Dict[str, List[int]]]:
+    """
+    Evidence index + postings, reused across calls with the same source_hash.
+    source_hash must identify structured_case, narrative and documents;
+    without one the index is built fresh.
+    """
+    if source_hash:
+        with _index_cache_lock:
+            hit = _index_cache.get(source_hash)
+            if hit is not None:
+                _index_cache.move_to_end(source_hash)
+                return hit
+
+    items = build_evidence_index(structured_case, narrative, documents)
+    built = (items, build_postings(items))
+
+    if source_hash:
+        with _index_cache_lock:
+            _index_cache[source_hash] = built
+            _index_cache.move_to_end(source_hash)
+            while len(_index_cache) > INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+    return built
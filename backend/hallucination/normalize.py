@@ -3,20 +3,45 @@ Text normalization utilities for stable matching despite casing,
 punctuation, units, and whitespace differences.
 """
 import re
+from functools import lru_cache
 
-_WS = re.compile(r"\s+")
 _PUNCT = re.compile(r"[^\w\s\.\+\-/%]")  # keep lab-relevant symbols
 _NUM = re.compile(r"(?<!\w)(\d+(\.\d+)?)(?!\w)")
 
+# Same character class as _PUNCT, restricted to ASCII, for str.translate
+_ASCII_PUNCT = str.maketrans({
+    c: " " for c in map(chr, range(128))
+    if not (c.isalnum() or c == "_" or c.isspace()) and c not in ".+-/%"
+})
+
+
+# Short strings (claims, red flags, repeated cell values like "none")
+# recur a lot; long narratives/documents are not worth keeping around.
+NORM_CACHE_MAX_LEN = 512
+
 
 def norm_text(s: str) -> str:
     """Normalize text for comparison: lowercase, strip punctuation, collapse whitespace."""
+    if s and len(s) > NORM_CACHE_MAX_LEN:
+        return _norm_text(s)
+    return _norm_text_cached(s)
+
+
+@lru_cache(maxsize=4096)
+def _norm_text_cached(s: str) -> str:
+    return _norm_text(s)
+
+
+def _norm_text(s: str) -> str:
     s = (s or "").strip().lower()
-    s = _PUNCT.sub(" ", s)
-    s = _WS.sub(" ", s).strip()
-    return s
+    # translate is a single C pass; the regex is only needed for non-ASCII
+    if s.isascii():
+        s = s.translate(_ASCII_PUNCT)
+    else:
+        s = _PUNCT.sub(" ", s)
+    return " ".join(s.split())
 
 
-def extract_numbers(s: str) -> list[str]:
-    """Extract all numeric values from a string (e.g., '0.45', '160', '98.6')."""
-    return [m.group(1) for m in _NUM.finditer(s or "")]
+def extract_number_set(s: str) -> frozenset[float]:
+    """Numeric values as floats, so '0.45' and '0.450' compare equal."""
+    return frozenset(float(m.group(1)) for m in _NUM.finditer(s or ""))